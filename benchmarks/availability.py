@@ -0,0 +1,161 @@
+"""
+Availability search latency at scale.
+
+Seeds the TEST database with BOOKINGS random stays and compares the hotel search
+(HotelsRepository.get_filtered_by_time, backed by room_inventory_daily) with the
+previous overlap-count CTE, which compared quantity with the number of
+overlapping bookings instead of the busiest night.
+
+    python -m benchmarks.availability --bookings 1000000
+
+The database is dropped and recreated, so this only runs with MODE=TEST.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, text
+
+from src.config import settings
+from src.database import Base, engine_null_pool, new_session_null_pool
+from src.models import BookingsOrm, HotelsOrm, RoomsOrm
+from src.repositories.utils import room_ids_for_booking
+from src.utils.db_manager import DBManager
+
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, email, hashed_password)
+    SELECT 'user' || i, 'user' || i || '@example.com', 'x' FROM generate_series(1, 1000) AS i
+    """,
+    """
+    INSERT INTO hotels (title, location)
+    SELECT 'Hotel ' || i, 'City ' || (i % 50) FROM generate_series(1, :hotels) AS i
+    """,
+    """
+    INSERT INTO rooms (hotel_id, title, description, price, quantity)
+    SELECT h.id, 'Room ' || r, NULL, 1000 + r * 100, 1 + (h.id + r) % 8
+    FROM hotels h CROSS JOIN generate_series(1, :rooms_per_hotel) AS r
+    """,
+    """
+    INSERT INTO bookings (user_id, hotel_id, room_id, check_in_date, check_out_date, price)
+    SELECT 1 + (i % 1000), r.hotel_id, r.id, s.check_in, s.check_in + (1 + i % 14), r.price
+    FROM generate_series(1, :bookings) AS i
+    JOIN rooms r ON r.id = 1 + (i::bigint * 7919) % (SELECT count(*) FROM rooms)
+    CROSS JOIN LATERAL (SELECT DATE '2030-01-01' + (i * 31) % 730 AS check_in) AS s
+    """,
+]
+
+
+def overlap_room_ids(date_from: date, date_to: date):
+    """Available rooms as computed before the per-night inventory."""
+    rooms_count = (
+        select(BookingsOrm.room_id, func.count("*").label("rooms_booked"))
+        .where(
+            BookingsOrm.check_in_date <= date_to,
+            BookingsOrm.check_out_date >= date_from,
+        )
+        .group_by(BookingsOrm.room_id)
+        .cte("rooms_count")
+    )
+    rooms_available = RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)
+    return (
+        select(RoomsOrm.id)
+        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
+        .where(rooms_available > 0)
+    )
+
+
+def overlap_count_query(date_from: date, date_to: date, limit: int):
+    """The hotel search as it was before the per-night inventory."""
+    hotel_ids = select(RoomsOrm.hotel_id).where(
+        RoomsOrm.id.in_(overlap_room_ids(date_from, date_to))
+    )
+    return select(HotelsOrm).where(HotelsOrm.id.in_(hotel_ids)).limit(limit)
+
+
+async def seed(args):
+    async with engine_null_pool.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        params = {
+            "hotels": args.hotels,
+            "rooms_per_hotel": args.rooms_per_hotel,
+            "bookings": args.bookings,
+        }
+        for sql in SEED_SQL:
+            await conn.execute(text(sql), params)
+    async with DBManager(session_factory=new_session_null_pool) as db:
+        await db.room_inventory.rebuild()
+        await db.commit()
+    async with engine_null_pool.connect() as conn:
+        await conn.execute(text("COMMIT"))
+        await conn.execute(text("VACUUM ANALYZE"))
+
+
+async def measure(name: str, run, windows) -> list[float]:
+    timings = []
+    for date_from, date_to in windows:
+        started = time.perf_counter()
+        await run(date_from, date_to)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<16} p50={p50:8.2f} ms  p95={p95:8.2f} ms  max={timings[-1]:8.2f} ms")
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--hotels", type=int, default=1_000)
+    parser.add_argument("--rooms-per-hotel", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    assert settings.MODE == "TEST", "The benchmark recreates the database, use MODE=TEST"
+    if not args.skip_seed:
+        started = time.perf_counter()
+        await seed(args)
+        print(f"seeded {args.bookings} bookings in {time.perf_counter() - started:.1f} s")
+
+    windows = []
+    for i in range(args.queries):
+        date_from = date(2030, 1, 1) + timedelta(days=i * 13 % 700)
+        windows.append((date_from, date_from + timedelta(days=1 + i % 7)))
+
+    async with DBManager(session_factory=new_session_null_pool) as db:
+
+        async def per_night(date_from, date_to):
+            return await db.hotels.get_filtered_by_time(date_from=date_from, date_to=date_to)
+
+        async def overlap_count(date_from, date_to):
+            result = await db.session.execute(overlap_count_query(date_from, date_to, 10))
+            return result.scalars().all()
+
+        baseline = await measure("overlap count", overlap_count, windows)
+        current = await measure("per-night peak", per_night, windows)
+
+        false_sold_out = 0
+        for date_from, date_to in windows[:10]:
+            per_night_ids = room_ids_for_booking(date_from, date_to)
+            inventory = set((await db.session.execute(per_night_ids)).scalars())
+            overlap = set(
+                (await db.session.execute(overlap_room_ids(date_from, date_to))).scalars()
+            )
+            false_sold_out += len(inventory - overlap)
+
+    budget = statistics.median(baseline)
+    print(
+        f"p50 within overlap-count budget: {statistics.median(current) <= budget}; "
+        f"rooms wrongly reported sold out by the overlap count (10 windows): {false_sold_out}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Booking throughput under concurrent load.
+
+Runs WORKERS concurrent sessions that each create bookings for random rooms and
+dates, first through the previous check-then-insert path (rooms.get_one,
+inventory.has_vacancy, bookings.add) and then through the single-statement
+BookingsRepository.create_booking, and reports bookings per second, rejected
+stays and oversold nights for both.
+
+    python -m benchmarks.booking_throughput --workers 32 --attempts 4000
+
+The database is dropped and recreated, so this only runs with MODE=TEST.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.availability import seed
+from src.config import settings
+from src.exeptions import AllRoomsAreBookedException
+from src.models import RoomInventoryDailyOrm
+from src.schemas.bookings import BookingAdd, BookingAddRequest
+from src.utils.db_manager import DBManager
+
+
+async def check_then_insert(db: DBManager, stay: BookingAddRequest, user_id: int):
+    """The booking path before the single-statement insert."""
+    room = await db.rooms.get_one(id=stay.room_id)
+    if not await db.room_inventory.has_vacancy(room.id, stay.check_in_date, stay.check_out_date):
+        raise AllRoomsAreBookedException
+    return await db.bookings.add(
+        BookingAdd(**stay.model_dump(), hotel_id=room.hotel_id, user_id=user_id, price=room.price)
+    )
+
+
+async def single_statement(db: DBManager, stay: BookingAddRequest, user_id: int):
+    return await db.bookings.create_booking(stay, user_id)
+
+
+async def run(name: str, book, stays: list[BookingAddRequest], workers: int):
+    # MODE=TEST engines use NullPool, measure with a connection per worker like production
+    engine = create_async_engine(settings.DB_URL, pool_size=workers)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    queue = asyncio.Queue()
+    for stay in stays:
+        queue.put_nowait(stay)
+    booked = rejected = 0
+
+    async def worker():
+        nonlocal booked, rejected
+        async with DBManager(session_factory=session_factory) as db:
+            while not queue.empty():
+                stay = queue.get_nowait()
+                try:
+                    await book(db, stay, user_id=1 + stay.room_id % 1000)
+                except AllRoomsAreBookedException:
+                    await db.rollback()
+                    rejected += 1
+                    continue
+                await db.commit()
+                booked += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - started
+
+    async with DBManager(session_factory=session_factory) as db:
+        oversold = select(func.count()).where(
+            RoomInventoryDailyOrm.booked > RoomInventoryDailyOrm.capacity
+        )
+        oversold_nights = (await db.session.execute(oversold)).scalar_one()
+    await engine.dispose()
+    print(
+        f"{name:<18} {booked / elapsed:8.1f} bookings/s  booked={booked}  "
+        f"rejected={rejected}  oversold nights={oversold_nights}"
+    )
+
+
+def random_stays(args, rng: random.Random) -> list[BookingAddRequest]:
+    """Stays concentrated on a few rooms and weeks, so that workers collide."""
+    rooms = args.hotels * args.rooms_per_hotel
+    stays = []
+    for _ in range(args.attempts):
+        check_in = date(2031, 1, 1) + timedelta(days=rng.randrange(args.days))
+        stays.append(
+            BookingAddRequest(
+                room_id=1 + rng.randrange(min(rooms, args.hot_rooms)),
+                check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=rng.randint(1, 7)),
+            )
+        )
+    return stays
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=4_000)
+    parser.add_argument("--hot-rooms", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--hotels", type=int, default=100)
+    parser.add_argument("--rooms-per-hotel", type=int, default=10)
+    args = parser.parse_args()
+    args.bookings = 0
+
+    assert settings.MODE == "TEST", "The benchmark recreates the database, use MODE=TEST"
+    stays = random_stays(args, random.Random(42))
+    for name, book in [
+        ("check then insert", check_then_insert),
+        ("single statement", single_statement),
+    ]:
+        await seed(args)
+        await run(name, book, stays, args.workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Login throughput with password hashing inline and in the process pool.
+
+Sends LOGINS POST /auth/login requests from CONCURRENCY clients through the ASGI
+app, first with argon2 running inline in the request handler and then on the
+src.init.password_hasher pool, and reports logins per second together with the
+worst event-loop stall seen meanwhile (how long any other request would have
+waited for the loop).
+
+    python -m benchmarks.login_throughput --logins 200 --concurrency 16
+
+The database is dropped and recreated, so this only runs with MODE=TEST.
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from src.config import settings
+from src.database import Base, engine_null_pool
+from src.init import password_hasher
+from src.main import app
+
+CREDENTIALS = {"email": "bench@example.com", "password": "bench-password"}
+
+
+async def loop_stalls(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Largest delay of a timer scheduled every `interval` seconds, in seconds."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(name: str, client: AsyncClient, logins: int, concurrency: int):
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with in_flight:
+            response = await client.post("/auth/login", json=CREDENTIALS)
+            assert response.status_code == 200, response.text
+
+    stop = asyncio.Event()
+    stalls = asyncio.create_task(loop_stalls(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    print(
+        f"{name:<14} {logins / elapsed:8.1f} logins/s  "
+        f"worst loop stall {await stalls * 1000:8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    assert settings.MODE == "TEST", "The benchmark recreates the database, use MODE=TEST"
+    async with engine_null_pool.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.post("/auth/register", json={**CREDENTIALS, "username": "bench"})
+        assert response.status_code == 200, response.text
+
+        await run("inline", client, args.logins, args.concurrency)
+        await password_hasher.start()
+        try:
+            await run(f"pool of {password_hasher.workers}", client, args.logins, args.concurrency)
+        finally:
+            await password_hasher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
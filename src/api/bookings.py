@@ -1,12 +1,14 @@
 from fastapi.exceptions import HTTPException  # noqa: F401
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Response
 from src.schemas.bookings import BookingAddRequest, BookingBulkRequest
-from src.api.dependencies import DBDep, UserDep
+from src.api.dependencies import DBDep, UserDep, PaginationDep, set_next_cursor
 from fastapi.responses import HTMLResponse
 from src.exeptions import (
     ObjectNotFoundException,
     AllRoomsAreBookedException,
     ObjectAlreadyExistsException,
+    InvalidCursorException,
+    InvalidDateRangeException,
     DatabaseException,
 )
 from src.services.bookings import BookingService
@@ -17,19 +19,36 @@ router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
 
 @router.get("/")
-async def get_bookings(db: DBDep):
+async def get_bookings(db: DBDep, pagination: PaginationDep, response: Response):
+    """All bookings without per_page or cursor, otherwise one page in (check_in_date, id) order."""
+    per_page, offset = pagination.limit_offset(default_per_page=None)
     try:
-        return await BookingService(db).get_all_bookings()
+        bookings = await BookingService(db).get_all_bookings(
+            per_page=per_page, offset=offset, cursor=pagination.cursor
+        )
+    except InvalidCursorException:
+        raise HTTPException(status_code=400, detail=InvalidCursorException.detail)
     except DatabaseException:
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    set_next_cursor(response, bookings, per_page, sort_key="check_in_date")
+    return bookings
 
 
 @router.get("/me")
-async def get_my_booking(db: DBDep, user_id: UserDep):
+async def get_my_booking(
+    db: DBDep, user_id: UserDep, pagination: PaginationDep, response: Response
+):
+    per_page, offset = pagination.limit_offset(default_per_page=None)
     try:
-        return await BookingService(db).get_my_bookings(user_id)
+        bookings = await BookingService(db).get_my_bookings(
+            user_id, per_page=per_page, offset=offset, cursor=pagination.cursor
+        )
+    except InvalidCursorException:
+        raise HTTPException(status_code=400, detail=InvalidCursorException.detail)
     except DatabaseException:
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    set_next_cursor(response, bookings, per_page, sort_key="check_in_date")
+    return bookings
 
 
 @router.post("")
@@ -70,6 +89,8 @@ async def create_booking(
             booking_data.check_out_date,
         )
         raise HTTPException(status_code=409, detail="All rooms are booked")
+    except InvalidDateRangeException:
+        raise HTTPException(status_code=422, detail=InvalidDateRangeException.detail)
     except DatabaseException:
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
     return {"status": "OK", "data": booking}
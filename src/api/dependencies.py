@@ -1,12 +1,14 @@
 from fastapi import Query, Depends
 from pydantic import BaseModel
-from typing import Annotated
-from fastapi import Request
-from src.services.auth import AuthService
+from typing import Annotated, Sequence
+from fastapi import Request, Response
+from src.services.auth import auth_service
 from fastapi import HTTPException
 from src.utils.db_manager import DBManager
 from src.database import new_session
+from src.init import token_revocation
 from src.exeptions import TokenExpiredException, InvalidTokenException
+from src.utils.pagination import encode_cursor
 
 
 class PaginationParams(BaseModel):
@@ -14,11 +16,31 @@ class PaginationParams(BaseModel):
     per_page: Annotated[
         int | None, Query(None, ge=1, lt=500, description="Number of hotels per page")
     ]
+    cursor: Annotated[
+        str | None,
+        Query(None, description="X-Next-Cursor of the previous page, used instead of page"),
+    ]
+
+    def limit_offset(self, default_per_page: int | None) -> tuple[int | None, int]:
+        """Page size and offset; with a cursor the page starts right after it."""
+        per_page = self.per_page or default_per_page
+        if self.cursor is not None or per_page is None:
+            return per_page, 0
+        return per_page, (self.page - 1) * per_page
 
 
 PaginationDep = Annotated[PaginationParams, Depends()]
 
 
+def set_next_cursor(
+    response: Response, items: Sequence, per_page: int | None, sort_key: str
+) -> None:
+    """A full page may have more rows after it: point X-Next-Cursor at its last row."""
+    if per_page and len(items) == per_page:
+        last = items[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(getattr(last, sort_key), last.id)
+
+
 def get_token(request: Request):
     token = request.cookies.get("access_token", None)
     if not token:
@@ -26,13 +48,15 @@ def get_token(request: Request):
     return token
 
 
-def get_current_user_id(token: str = Depends(get_token)):
+async def get_current_user_id(token: str = Depends(get_token)):
     try:
-        data = AuthService().decode_access_token(token)
+        data = auth_service.decode_access_token(token)
     except TokenExpiredException:
         raise HTTPException(status_code=401, detail="Token expired")
     except InvalidTokenException:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if "jti" in data and await token_revocation.is_revoked(data["jti"]):
+        raise HTTPException(status_code=401, detail="Token revoked")
     return data["user_id"]
 
 
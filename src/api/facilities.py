@@ -4,13 +4,14 @@ from src.schemas.facilities import FacilityAdd
 from src.api.dependencies import DBDep
 from src.exeptions import ObjectAlreadyExistsException, DatabaseException
 from src.services.facilities import FacilityService
-from fastapi_cache.decorator import cache
+from fastapi_cache import FastAPICache
+from src.utils.two_tier_cache import cache_route
 
 router = APIRouter(prefix="/facilities", tags=["Facilities"])
 
 
 @router.get("")
-@cache(expire=10)
+@cache_route(expire=10, namespace="facilities")
 async def get_all_facilities(db: DBDep):
     try:
         return await FacilityService(db).get_all_facilities()
@@ -44,4 +45,17 @@ async def create_facility(
         raise HTTPException(status_code=409, detail="Facility already exists")
     except DatabaseException:
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    # Drop the cached catalog in Redis and in every worker
+    await FastAPICache.clear(namespace="facilities")
     return {"status": "OK", "data": facility}
+
+
+@router.post("/bulk")
+async def create_facilities_bulk(db: DBDep, facilities_data: list[FacilityAdd]):
+    """Create the facilities that do not exist yet; existing titles are left unchanged."""
+    try:
+        result = await FacilityService(db).create_facilities_bulk(facilities_data)
+    except DatabaseException:
+        raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    await FastAPICache.clear(namespace="facilities")
+    return {"status": "OK", **result.model_dump()}
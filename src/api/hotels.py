@@ -1,16 +1,17 @@
 from fastapi.exceptions import HTTPException  # noqa: F401
-from fastapi import Query, APIRouter, Body
+from fastapi import Query, APIRouter, Body, Response
 from fastapi import UploadFile, File
 from datetime import date
 from loguru import logger
 
 from src.schemas.hotels import HotelAdd, HotelPatch
-from src.api.dependencies import PaginationDep
+from src.api.dependencies import PaginationDep, set_next_cursor
 from src.api.dependencies import DBDep
 from src.exeptions import (
     ObjectNotFoundException,
     ObjectAlreadyExistsException,
     InvalidDateRangeException,
+    InvalidCursorException,
     DatabaseException,
 )
 from src.services.hotels import HotelService
@@ -19,6 +20,26 @@ from src.services.hotels import HotelService
 router = APIRouter(prefix="/hotels", tags=["Hotels"])
 
 
+@router.get("/search")
+async def search_hotels(
+    db: DBDep,
+    pagination: PaginationDep,
+    q: str = Query(
+        min_length=1,
+        max_length=200,
+        description='Words to look for in hotels and their rooms, e.g. "sea view spa"',
+    ),
+):
+    per_page = pagination.per_page or 10
+    offset = (pagination.page - 1) * per_page
+    try:
+        hotels = await HotelService(db).search_hotels(text=q, per_page=per_page, offset=offset)
+    except DatabaseException:
+        logger.error("Database error occurred")
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    return hotels
+
+
 @router.get("/{hotel_id}")
 async def get_hotel_by_id(hotel_id: int, db: DBDep):
     try:
@@ -28,18 +49,28 @@ async def get_hotel_by_id(hotel_id: int, db: DBDep):
         raise HTTPException(status_code=404, detail="Hotel not found")
     return hotel
 
+
 @router.get("")
 async def get_hotels(
     db: DBDep,
     pagination: PaginationDep,
+    response: Response,
     date_from: date = Query(examples=["2026-01-01"]),
     date_to: date = Query(examples=["2026-01-05"]),
     available: bool = Query(True, description="Hotels with available rooms or without"),
     title: str | None = Query(None, description="Hotel title"),
     location: str | None = Query(None, description="Hotel location"),
+    fuzzy: bool = Query(
+        False, description="Typo-tolerant title/location match, ranked by similarity"
+    ),
+    summary: bool = Query(
+        False, description="Add rooms_left and min_price of each hotel for the dates"
+    ),
+    facilities: list[int] = Query(
+        [], description="Only hotels with a room having all of these facility IDs"
+    ),
 ):
-    per_page = pagination.per_page or 10
-    offset = (pagination.page - 1) * per_page
+    per_page, offset = pagination.limit_offset(default_per_page=10)
     try:
         hotels = await HotelService(db).get_all_hotels(
             date_from=date_from,
@@ -49,12 +80,20 @@ async def get_hotels(
             location=location,
             per_page=per_page,
             offset=offset,
+            fuzzy=fuzzy,
+            cursor=pagination.cursor,
+            with_summary=summary,
+            facility_ids=facilities,
         )
     except DatabaseException:
         logger.error("Database error occurred")
         raise HTTPException(status_code=500, detail="Database error occurred")
     except InvalidDateRangeException:
         raise HTTPException(status_code=422, detail=InvalidDateRangeException.detail)
+    except InvalidCursorException:
+        raise HTTPException(status_code=400, detail=InvalidCursorException.detail)
+    if not fuzzy:
+        set_next_cursor(response, hotels, per_page, sort_key="title")
     return hotels
 
 
@@ -0,0 +1,22 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter
+
+from src.init import repository_cache, response_cache, token_revocation, user_profile_cache
+from src.services.auth import auth_service
+from src.utils.db_manager import commit_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """Counters of the in-process caches and transactions of this worker."""
+    return {
+        "token_cache": auth_service.token_cache.stats(),
+        "token_revocation": token_revocation.stats(),
+        "user_profile_cache": user_profile_cache.stats(),
+        "repository_cache": repository_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "transactions": asdict(commit_stats),
+    }
@@ -36,9 +36,10 @@ async def get_all_rooms(
     hotel_id: int,
     date_from: date = Query(examples=["2025-01-01"]),
     date_to: date = Query(examples=["2025-01-05"]),
+    facilities: list[int] = Query([], description="Only rooms with all of these facility IDs"),
 ):
     try:
-        rooms = await RoomService(db).get_all_rooms(hotel_id, date_from, date_to)
+        rooms = await RoomService(db).get_all_rooms(hotel_id, date_from, date_to, facilities)
     except InvalidDateRangeException:
         raise HTTPException(status_code=422, detail="date_to must be after date_from")
     except DatabaseException:
@@ -130,11 +131,11 @@ async def create_rooms_bulk(db: DBDep, rooms_data: list[RoomAddBulk]):
     hotel_id is passed in body for each room.
     """
     try:
-        count = await RoomService(db).create_rooms_bulk(rooms_data)
+        count, rows_per_second = await RoomService(db).create_rooms_bulk(rooms_data)
     except ObjectNotFoundException as ex:
         raise HTTPException(status_code=404, detail=str(ex.detail))
     except ObjectAlreadyExistsException:
         raise HTTPException(status_code=409, detail="One or more rooms already exist")
     except DatabaseException:
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
-    return {"status": "OK", "created": count}
+    return {"status": "OK", "created": count, "rows_per_second": rows_per_second}
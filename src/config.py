@@ -10,8 +10,17 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_HOST: str
     DB_PORT: int
+    BOOKING_ISOLATION_LEVEL: Literal["READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE"] = (
+        "READ COMMITTED"
+    )
     REDIS_HOST: str
     REDIS_PORT: int
+    # Connections per Redis client (each worker has a str and a bytes client)
+    REDIS_MAX_CONNECTIONS: int = 50
+    # Wait for a free connection of the pool, then fail
+    REDIS_POOL_TIMEOUT_SECONDS: float = 2
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 2
 
     @property
     def REDIS_URL(self):
@@ -24,6 +33,27 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int
+    TOKEN_CACHE_SIZE: int = 10_000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    # Processes hashing passwords, None for one per CPU
+    PASSWORD_HASH_WORKERS: int | None = None
+    # How often each worker reloads revoked tokens from Redis into its Bloom filter
+    REVOCATION_SYNC_SECONDS: float = 5
+    REVOCATION_FILTER_CAPACITY: int = 100_000
+    PROFILE_CACHE_TTL_SECONDS: int = 3600
+    # Not a freshness bound: writes invalidate entries, this only expires unread ones
+    REPOSITORY_CACHE_TTL_SECONDS: int = 86400
+    # Hot searches are refreshed before they expire, cold ones go within this
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 600
+    # In-process tier of the fastapi-cache backend, per worker
+    L1_CACHE_SIZE: int = 1000
+    L1_CACHE_TTL_SECONDS: float = 5
+    # How long concurrent misses wait for the request loading the same value
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 5
+    # Also make the other workers wait for it, through a lock in Redis
+    SINGLE_FLIGHT_REDIS_LOCK: bool = False
+    # Early refresh eagerness (XFetch beta), higher refreshes cached values sooner
+    EARLY_REFRESH_BETA: float = 1.0
 
     # to load env variables from .env file
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
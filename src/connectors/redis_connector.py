@@ -1,18 +1,56 @@
-import redis.asyncio as redis
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Mapping
+
+from redis.asyncio import BlockingConnectionPool
 from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import Pipeline
 
 
 class RedisManager:
-    def __init__(self, host: str, port: int):
+    """
+    Two clients of the same server: `redis` decodes replies to str, `redis_bytes`
+    returns them as bytes, for binary payloads such as msgpack. Values written
+    through either may be str or bytes.
+
+    Each client has its own pool of at most `max_connections`; a command waits up
+    to `pool_timeout` seconds for a free connection, then fails with
+    ConnectionError, and up to `socket_timeout` seconds for its reply.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = 50,
+        socket_timeout: float | None = 5.0,
+        connect_timeout: float | None = 2.0,
+        pool_timeout: float | None = 2.0,
+    ):
         self.host = host
         self.port = port
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.connect_timeout = connect_timeout
+        self.pool_timeout = pool_timeout
         self.redis: AsyncRedis | None = None
+        self.redis_bytes: AsyncRedis | None = None
+
+    def _client(self, decode_responses: bool) -> AsyncRedis:
+        pool = BlockingConnectionPool.from_url(
+            f"redis://{self.host}:{self.port}",
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.connect_timeout,
+            decode_responses=decode_responses,
+        )
+        return AsyncRedis.from_pool(pool)
 
     async def connect(self):
-        # We use decode_responses=True to get strings instead of bytes
-        self.redis = await redis.from_url(f"redis://{self.host}:{self.port}", decode_responses=True)
+        self.redis = self._client(decode_responses=True)
+        self.redis_bytes = self._client(decode_responses=False)
 
-    async def set(self, key: str, value: str, expire: int | None = None):
+    async def set(self, key: str, value: str | bytes, expire: int | None = None):
         assert self.redis is not None
         await self.redis.set(key, value, ex=expire)
 
@@ -20,10 +58,61 @@ class RedisManager:
         assert self.redis is not None
         return await self.redis.get(key)
 
-    async def delete(self, key: str):
+    async def set_bytes(self, key: str, value: bytes, expire: int | None = None):
+        assert self.redis_bytes is not None
+        await self.redis_bytes.set(key, value, ex=expire)
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        assert self.redis_bytes is not None
+        return await self.redis_bytes.get(key)
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
         assert self.redis is not None
-        await self.redis.delete(key)
+        return await self.redis.mget(keys) if keys else []
+
+    async def mget_bytes(self, keys: list[str]) -> list[bytes | None]:
+        assert self.redis_bytes is not None
+        return await self.redis_bytes.mget(keys) if keys else []
+
+    async def mset(self, values: Mapping[str, str | bytes], expire: int | None = None):
+        """All of `values` in one round trip, each expiring after `expire` seconds if given."""
+        assert self.redis is not None
+        if not values:
+            return
+        if expire is None:
+            await self.redis.mset(values)
+            return
+        # MSET takes no expiry
+        async with self.pipeline() as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=expire)
+
+    async def delete(self, *keys: str):
+        assert self.redis is not None
+        if keys:
+            await self.redis.delete(*keys)
+
+    @asynccontextmanager
+    async def pipeline(
+        self, transaction: bool = False, binary: bool = False
+    ) -> AsyncIterator[Pipeline]:
+        """
+        Commands queued in the block are sent in one round trip when it exits, or
+        by `await pipe.execute()` inside it, which returns their replies. Nothing
+        is sent if the block raises.
+        """
+        client = self.redis_bytes if binary else self.redis
+        assert client is not None
+        async with client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            await pipe.execute()
+
+    def transaction(self, binary: bool = False):
+        """pipeline() in MULTI/EXEC: its commands run together, nothing runs in between."""
+        return self.pipeline(transaction=True, binary=binary)
 
     async def close(self):
         if self.redis:
             await self.redis.aclose()
+        if self.redis_bytes:
+            await self.redis_bytes.aclose()
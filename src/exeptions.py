@@ -9,6 +9,14 @@ class ObjectNotFoundException(BookingsExeption):
     detail = "Object not found"
 
 
+class HotelNotFoundException(ObjectNotFoundException):
+    detail = "Hotel not found"
+
+
+class FacilityNotFoundException(ObjectNotFoundException):
+    detail = "Facility not found"
+
+
 class AllRoomsAreBookedException(BookingsExeption):
     detail = "All rooms are booked"
 
@@ -32,6 +40,9 @@ class InvalidTokenException(BookingsExeption):
 class InvalidDateRangeException(BookingsExeption):
     detail = "date_to must be after date_from"
 
+class InvalidCursorException(BookingsExeption):
+    detail = "Invalid pagination cursor"
+
 
 def check_date_range(date_from, date_to):
     if date_from >= date_to:
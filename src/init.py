@@ -1,6 +1,57 @@
 from src.connectors.redis_connector import RedisManager
 from src.config import settings
+from src.utils.password_hasher import PasswordHasher
+from src.utils.profile_cache import UserProfileCache
+from src.utils.repository_cache import RepositoryCache
+from src.utils.revocation import TokenRevocationList
+from src.utils.stampede import SingleFlight
+from src.utils.two_tier_cache import TwoTierCache
 
 
 # Global Redis manager instance
-redis_manager = RedisManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+redis_manager = RedisManager(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+)
+
+# Process pool for password hashing, started in the app lifespan
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS)
+
+# Tokens revoked on logout, checked on every authenticated request
+token_revocation = TokenRevocationList(
+    redis_manager,
+    sync_interval=settings.REVOCATION_SYNC_SECONDS,
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+)
+
+# Profiles served by GET /auth/me
+user_profile_cache = UserProfileCache(redis_manager, ttl=settings.PROFILE_CACHE_TTL_SECONDS)
+
+# Primary key reads of the cached repositories (hotels, rooms, facilities)
+repository_cache = RepositoryCache(
+    redis_manager,
+    ttl=settings.REPOSITORY_CACHE_TTL_SECONDS,
+    flight=SingleFlight(
+        redis_manager,
+        timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS,
+        lock=settings.SINGLE_FLIGHT_REDIS_LOCK,
+    ),
+    beta=settings.EARLY_REFRESH_BETA,
+)
+
+# fastapi-cache backend: per-worker LRU in front of Redis, started in the app lifespan
+response_cache = TwoTierCache(
+    redis_manager,
+    maxsize=settings.L1_CACHE_SIZE,
+    ttl=settings.L1_CACHE_TTL_SECONDS,
+    flight=SingleFlight(
+        redis_manager,
+        timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS,
+        lock=settings.SINGLE_FLIGHT_REDIS_LOCK,
+    ),
+    beta=settings.EARLY_REFRESH_BETA,
+)
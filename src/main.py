@@ -1,7 +1,6 @@
 from fastapi import FastAPI
 import uvicorn
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from loguru import logger
@@ -12,7 +11,9 @@ from src.api.auth import router as router_auth
 from src.api.rooms import router as router_rooms, bulk_router as rooms_bulk_router
 from src.api.bookings import router as router_bookings
 from src.api.facilities import router as router_facilities
-from src.init import redis_manager
+from src.api.metrics import router as router_metrics
+from src.init import password_hasher, redis_manager, response_cache, token_revocation
+from src.utils.two_tier_cache import request_key_builder
 
 setup_logging()
 
@@ -21,9 +22,16 @@ async def lifespan(app: FastAPI):
     logger.info("Application starting up...")
     await redis_manager.connect()  # when app starts
     assert redis_manager.redis is not None
-    FastAPICache.init(RedisBackend(redis_manager.redis), prefix="fastapi-cache")
+    await response_cache.start()
+    FastAPICache.init(response_cache, prefix="fastapi-cache", key_builder=request_key_builder)
     logger.info("Redis connected, cache initialized")
+    await token_revocation.start()
+    await password_hasher.start()
+    logger.info("Password hashing pool started: workers={}", password_hasher.workers)
     yield
+    await password_hasher.close()
+    await token_revocation.close()
+    await response_cache.close()
     await redis_manager.close()  # when app stops/restarts
     logger.info("Application shut down")
 
@@ -36,6 +44,7 @@ app.include_router(router_rooms)
 app.include_router(rooms_bulk_router)
 app.include_router(router_bookings)
 app.include_router(router_facilities)
+app.include_router(router_metrics)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 if __name__ == "__main__":
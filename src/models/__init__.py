@@ -3,3 +3,4 @@ from src.models.rooms import RoomsOrm as RoomsOrm
 from src.models.users import UsersOrm as UsersOrm
 from src.models.bookings import BookingsOrm as BookingsOrm
 from src.models.facilities import FacilitiesOrm as FacilitiesOrm
+from src.models.room_inventory import RoomInventoryDailyOrm as RoomInventoryDailyOrm
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import DATERANGE, Range
 from src.database import Base
 from datetime import date
-from sqlalchemy import DateTime, Integer, ForeignKey
+from sqlalchemy import Computed, Date, Index, Integer, ForeignKey
 
 
 class BookingsOrm(Base):
@@ -11,9 +12,22 @@ class BookingsOrm(Base):
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
     hotel_id: Mapped[int] = mapped_column(Integer, ForeignKey("hotels.id"))
     room_id: Mapped[int] = mapped_column(Integer, ForeignKey("rooms.id"))
-    check_in_date: Mapped[date] = mapped_column(DateTime)
-    check_out_date: Mapped[date] = mapped_column(DateTime)
+    check_in_date: Mapped[date] = mapped_column(Date)
+    check_out_date: Mapped[date] = mapped_column(Date)
     price: Mapped[int] = mapped_column(Integer)
+    # Nights of the stay: check-in day included, check-out day excluded
+    stay: Mapped[Range[date]] = mapped_column(
+        DATERANGE, Computed("daterange(check_in_date, check_out_date, '[)')", persisted=True)
+    )
+
+    # GiST over (room_id, stay) needs the btree_gist extension for the integer column
+    __table_args__ = (
+        Index("ix_bookings_room_id_stay", "room_id", "stay", postgresql_using="gist"),
+        Index("ix_bookings_room_id_dates", "room_id", "check_in_date", "check_out_date"),
+        # Keyset pagination seeks by (check_in_date, id), overall and per user
+        Index("ix_bookings_check_in_date_id", "check_in_date", "id"),
+        Index("ix_bookings_user_id_check_in_date_id", "user_id", "check_in_date", "id"),
+    )
 
     @hybrid_property
     def total_price(self) -> int:
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database import Base
-from sqlalchemy import String, BigInteger
+from sqlalchemy import String, BigInteger, Index, UniqueConstraint
 
 if TYPE_CHECKING:
     from src.models.rooms import RoomsOrm
@@ -27,3 +27,8 @@ class RoomFacilitiesOrm(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     room_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("rooms.id"))
     facility_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("facilities.id"))
+
+    __table_args__ = (
+        UniqueConstraint("room_id", "facility_id", name="uq_room_facilities_room_id_facility_id"),
+        Index("ix_room_facilities_facility_id", "facility_id", "room_id"),
+    )
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Mapped, mapped_column
 from src.database import Base
-from sqlalchemy import String, BigInteger, JSON
+from sqlalchemy import String, BigInteger, JSON, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 
 class HotelsOrm(Base):
@@ -9,3 +10,26 @@ class HotelsOrm(Base):
     title: Mapped[str] = mapped_column(String(100))
     location: Mapped[str] = mapped_column(String(1000000))
     images: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+    # Title, location and the text of all rooms of the hotel. It depends on other rows,
+    # so HotelsRepository.refresh_search_vector keeps it up to date instead of a
+    # generated column
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, deferred=True)
+
+    # Trigram indexes (pg_trgm) serve both ilike('%...%') and the fuzzy search operators
+    __table_args__ = (
+        Index(
+            "ix_hotels_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_hotels_location_trgm",
+            "location",
+            postgresql_using="gin",
+            postgresql_ops={"location": "gin_trgm_ops"},
+        ),
+        Index("ix_hotels_search_vector", "search_vector", postgresql_using="gin"),
+        # Listing order and keyset pagination cursor
+        Index("ix_hotels_title_id", "title", "id"),
+    )
@@ -0,0 +1,27 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Date, ForeignKey, Index, Integer
+from src.database import Base
+
+
+class RoomInventoryDailyOrm(Base):
+    """Per-night occupancy of a room, maintained by BookingsRepository."""
+
+    __tablename__ = "room_inventory_daily"
+    room_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True
+    )
+    night: Mapped[date] = mapped_column(Date, primary_key=True)
+    booked: Mapped[int] = mapped_column(Integer, default=0)
+    capacity: Mapped[int] = mapped_column(Integer)
+
+    __table_args__ = (
+        # Only sold-out nights are ever looked up by the availability query
+        Index(
+            "ix_room_inventory_daily_sold_out",
+            "room_id",
+            "night",
+            postgresql_where=booked >= capacity,
+        ),
+    )
@@ -4,7 +4,8 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database import Base
-from sqlalchemy import String, BigInteger, ForeignKey
+from sqlalchemy import String, BigInteger, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 
 if TYPE_CHECKING:
     from src.models.facilities import FacilitiesOrm
@@ -18,7 +19,35 @@ class RoomsOrm(Base):
     description: Mapped[str | None] = mapped_column(String(1000000))
     price: Mapped[int]
     quantity: Mapped[int]
+    # Weights C and D rank room matches below the hotel title (A) and location (B),
+    # see HotelsOrm.search_vector
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', title), 'C') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'D')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    # Copy of room_facilities.facility_id for containment filters (@>) through a GIN
+    # index, kept in sync by RoomFacilitiesRepository
+    facility_ids: Mapped[list[int]] = mapped_column(
+        ARRAY(BigInteger), server_default="{}", deferred=True
+    )
 
     facilities: Mapped[list["FacilitiesOrm"]] = relationship(
         secondary="room_facilities", back_populates="rooms"
     )
+
+    __table_args__ = (
+        # Covers the per-hotel room lookups of the availability search
+        Index(
+            "ix_rooms_hotel_id",
+            "hotel_id",
+            "id",
+            postgresql_include=["quantity", "price"],
+        ),
+        Index("ix_rooms_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_rooms_facility_ids", "facility_ids", postgresql_using="gin"),
+    )
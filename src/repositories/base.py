@@ -1,14 +1,42 @@
-from typing import Any, Sequence
-from sqlalchemy import select, insert, update, delete
-from sqlalchemy.exc import NoResultFound, IntegrityError
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, ClassVar, Sequence
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    bindparam,
+    column,
+    func,
+    literal_column,
+    select,
+    insert,
+    update,
+    delete,
+    tuple_,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError, NoResultFound, IntegrityError
 from pydantic import BaseModel
-from asyncpg import UniqueViolationError
+from asyncpg import PostgresError, UniqueViolationError
 from src.repositories.mappers.base import DataMapper
 from src.database import Base
 from src.exeptions import ObjectNotFoundException, ObjectAlreadyExistsException
+from src.schemas.bulk import BulkUpsertResult
+from src.init import repository_cache
+from src.utils.repository_cache import CacheEntry
 from loguru import logger
 
 
+# Postgres protocol limit on the parameters of one statement
+MAX_BIND_PARAMS = 32767
+
+# session.info key of the callbacks DBManager runs once the transaction commits
+AFTER_COMMIT = "after_commit"
+# session.info key of the cache tags the transaction wrote to
+CACHE_TAGS = "cache_tags"
+
+
 class BaseRepository:
     """
     Base repository class for working with custom sessions and models
@@ -16,10 +44,105 @@ class BaseRepository:
 
     model: type[Base]
     mapper: type[DataMapper]
+    # Reads by primary key go through repository_cache, tagged "<table>:<id>";
+    # writes invalidate "<table>" and the tags of the rows they touched
+    cached: ClassVar[bool] = False
 
     def __init__(self, session):
         self.session = session
 
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run callback() after the current transaction commits, drop it on rollback."""
+        self.session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+    def invalidate(self, *tags: str) -> None:
+        """Invalidate the cache entries with any of the tags once the transaction commits."""
+        if CACHE_TAGS not in self.session.info:
+            self.session.info[CACHE_TAGS] = set()
+            self.after_commit(self._invalidate_written_tags)
+        self.session.info[CACHE_TAGS].update(tags)
+
+    def invalidate_rows(self, ids) -> None:
+        table = self.model.__tablename__
+        self.invalidate(table, *(f"{table}:{id}" for id in ids))
+
+    async def _invalidate_written_tags(self) -> None:
+        await repository_cache.invalidate(self.session.info.pop(CACHE_TAGS, ()))
+
+    async def read_through(
+        self,
+        filter_by: dict,
+        load: Callable[[], Awaitable[Any]],
+        schema: type[BaseModel] | None = None,
+        tags: Sequence[str] = (),
+    ) -> Any:
+        """load(), cached when the filter has the primary key and tagged with the row."""
+        if not self.cached or "id" not in filter_by:
+            return await load()
+        table = self.model.__tablename__
+        return await self.cached_read(
+            "one",
+            filter_by,
+            load,
+            tags=[f"{table}:{filter_by['id']}", *tags],
+            schema=schema,
+        )
+
+    async def cached_read(
+        self,
+        name: str,
+        params: dict,
+        load: Callable[[], Awaitable[Any]],
+        tags: Sequence[str],
+        schema: type[BaseModel] | None = None,
+        many: bool = False,
+        ttl: int | None = None,
+        related: Callable[[Any], list[CacheEntry]] | None = None,
+    ) -> Any:
+        """
+        load() through repository_cache, keyed by `name` and `params` and invalidated
+        by `tags`. Tags this transaction wrote are read from the database, their
+        entries are only invalidated after the commit. `related` gives the entries
+        of other reads found in the result, see read_through_entries().
+        """
+        if not self.session.info.get(CACHE_TAGS, set()).isdisjoint(tags):
+            return await load()
+        schema = schema or self.mapper.schema
+        return await repository_cache.get_or_load(
+            self._cache_key(name, params, schema),
+            tags,
+            load,
+            dump=lambda data: self.mapper.dump_cached(data, schema, many),
+            parse=lambda payload: self.mapper.load_cached(payload, schema, many),
+            ttl=ttl,
+            related=related,
+        )
+
+    def _cache_key(self, name: str, params: dict, schema: type[BaseModel]) -> str:
+        digest = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+        return f"{self.model.__tablename__}:{name}:{schema.__name__}:{digest}"
+
+    def read_through_entries(
+        self,
+        rows: Sequence[BaseModel],
+        schema: type[BaseModel] | None = None,
+        tags: Sequence[str] = (),
+    ) -> list[CacheEntry]:
+        """
+        The entries read_through() would store for get_one(id=...) of each row, with
+        the same `schema` and `tags`, to fill them from rows a list query loaded.
+        """
+        schema = schema or self.mapper.schema
+        table = self.model.__tablename__
+        return [
+            (
+                self._cache_key("one", {"id": row.id}, schema),
+                [f"{table}:{row.id}", *tags],
+                self.mapper.dump_cached(row, schema),
+            )
+            for row in rows
+        ]
+
     async def get_filtered(self, *filter, **filter_by) -> list[BaseModel | Any]:
         query = select(self.model).filter(*filter).filter_by(**filter_by)
         result = await self.session.execute(query)
@@ -29,6 +152,9 @@ class BaseRepository:
         return await self.get_filtered(**kwargs)
 
     async def get_one_or_none(self, **filter_by) -> BaseModel | None | Any:
+        return await self.read_through(filter_by, lambda: self._get_one_or_none(**filter_by))
+
+    async def _get_one_or_none(self, **filter_by) -> BaseModel | None | Any:
         query = select(self.model).filter_by(**filter_by)
         result = await self.session.execute(query)
         model = result.scalars().one_or_none()
@@ -37,6 +163,9 @@ class BaseRepository:
         return self.mapper.map_to_schema(model)
 
     async def get_one(self, **filter_by) -> BaseModel | Any:
+        return await self.read_through(filter_by, lambda: self._get_one(**filter_by))
+
+    async def _get_one(self, **filter_by) -> BaseModel | Any:
         query = select(self.model).filter_by(**filter_by)
         result = await self.session.execute(query)
         try:
@@ -46,6 +175,17 @@ class BaseRepository:
             raise ObjectNotFoundException
         return self.mapper.map_to_schema(model)
 
+    async def missing_ids(self, ids) -> list[int]:
+        """The ids among `ids` that have no row, in one query."""
+        ids_table = (
+            func.unnest(bindparam("ids", list(ids), type_=ARRAY(BigInteger)))
+            .table_valued(column("id", BigInteger))
+            .render_derived()
+        )
+        query = select(ids_table.c.id).except_(select(self.model.id))
+        result = await self.session.execute(query)
+        return sorted(result.scalars().all())
+
     async def add(self, data: BaseModel | Sequence[BaseModel]) -> BaseModel | Sequence[BaseModel]:
         if isinstance(data, BaseModel):
             data_to_insert = data.model_dump()
@@ -61,6 +201,8 @@ class BaseRepository:
                 raise ObjectAlreadyExistsException from ex
             else:
                 raise ex
+        if self.cached:
+            self.invalidate_rows([model.id])
         return self.mapper.map_to_schema(model)
 
     async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> None:
@@ -69,11 +211,19 @@ class BaseRepository:
             .filter_by(**filter_by)
             .values(**data.model_dump(exclude_unset=exclude_unset))
         )
-        await self.session.execute(update_stmt)
+        if self.cached:
+            update_stmt = update_stmt.returning(self.model.id)
+        result = await self.session.execute(update_stmt)
+        if self.cached:
+            self.invalidate_rows(result.scalars().all())
 
     async def delete(self, **filter_by) -> None:
         delete_stmt = delete(self.model).filter_by(**filter_by)
-        await self.session.execute(delete_stmt)
+        if self.cached:
+            delete_stmt = delete_stmt.returning(self.model.id)
+        result = await self.session.execute(delete_stmt)
+        if self.cached:
+            self.invalidate_rows(result.scalars().all())
 
     async def add_bulk(self, data: Sequence[BaseModel]) -> None:
         """
@@ -88,4 +238,99 @@ class BaseRepository:
             if isinstance(ex.orig.__cause__, UniqueViolationError):
                 raise ObjectAlreadyExistsException from ex
             else:
-                raise ex
\ No newline at end of file
+                raise ex
+        if self.cached:
+            self.invalidate_rows([])
+
+    async def upsert_bulk(
+        self,
+        data: Sequence[BaseModel],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str] | None = None,
+    ) -> BulkUpsertResult:
+        """
+        Insert the rows, and for rows whose conflict_cols (a unique key) already exist
+        either set update_cols from the new row or, without update_cols, keep the
+        existing row. Existing rows whose update_cols already hold the new values are
+        not touched. One INSERT ... ON CONFLICT per chunk, sized to stay under the
+        parameter limit. When the data repeats a key, the last row wins.
+        Returns the counts, and the ids of the inserted and updated rows in `ids`.
+        """
+        rows = {}
+        for item in data:
+            row = item.model_dump()
+            rows[tuple(row[col] for col in conflict_cols)] = row
+        rows = list(rows.values())
+        result = BulkUpsertResult()
+        if not rows:
+            return result
+
+        chunk_size = MAX_BIND_PARAMS // len(rows[0])
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            insert_stmt = postgresql.insert(self.model).values(chunk)
+            if update_cols:
+                target = tuple_(*(getattr(self.model, col) for col in update_cols))
+                new_values = tuple_(*(insert_stmt.excluded[col] for col in update_cols))
+                upsert_stmt = insert_stmt.on_conflict_do_update(
+                    index_elements=conflict_cols,
+                    set_={col: insert_stmt.excluded[col] for col in update_cols},
+                    where=target.is_distinct_from(new_values),
+                )
+            else:
+                upsert_stmt = insert_stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+            # xmax is 0 on a freshly inserted row version and the locking transaction
+            # on an updated one
+            inserted = literal_column("xmax = 0", Boolean)
+            upsert_stmt = upsert_stmt.returning(self.model.id, inserted)
+            returned = (await self.session.execute(upsert_stmt)).all()
+
+            inserted_count = sum(1 for _, is_new in returned if is_new)
+            result.inserted += inserted_count
+            result.updated += len(returned) - inserted_count
+            result.unchanged += len(chunk) - len(returned)
+            result.ids.extend(row_id for row_id, _ in returned)
+        if self.cached:
+            self.invalidate_rows(result.ids)
+        return result
+
+    async def copy_bulk(self, data: Sequence[BaseModel]) -> int:
+        """
+        Bulk insert with a binary COPY instead of an INSERT statement: no limit on the
+        number of rows, nothing to compile, and the rows are streamed to the server
+        as they are converted. Columns are taken from the first model.
+        Returns the number of rows copied.
+        """
+        if not data:
+            return 0
+        columns = list(data[0].model_dump())
+        records = (tuple(item.model_dump().values()) for item in data)
+
+        connection = await self.session.connection()
+        # The driver opens its transaction lazily, on the first statement: make sure
+        # COPY runs inside it instead of committing on its own
+        await connection.exec_driver_sql("SELECT 1")
+        raw_connection = await connection.get_raw_connection()
+        started = time.perf_counter()
+        try:
+            status = await raw_connection.driver_connection.copy_records_to_table(
+                self.model.__tablename__, records=records, columns=columns
+            )
+        except UniqueViolationError as ex:
+            raise ObjectAlreadyExistsException from ex
+        except PostgresError as ex:
+            # Keep the SQLSTATE visible to DBManager.run_in_transaction and the
+            # services, which handle SQLAlchemy errors only
+            raise DBAPIError(f"COPY {self.model.__tablename__}", None, ex) from ex
+        copied = int(status.split()[-1])
+        if self.cached:
+            self.invalidate_rows([])
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "COPY {} rows into {} in {:.3f}s ({:.0f} rows/s)",
+            copied,
+            self.model.__tablename__,
+            elapsed,
+            copied / elapsed if elapsed else 0,
+        )
+        return copied
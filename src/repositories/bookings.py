@@ -1,47 +1,307 @@
+from typing import Sequence
+
+from pydantic import BaseModel
 from src.repositories.base import BaseRepository
+from src.repositories.room_inventory import RoomInventoryRepository
+from src.repositories.utils import availability_tags, seek_after, stay_overlaps
 from src.models.bookings import BookingsOrm
 from src.repositories.mappers.mappers import BookingMapper
-from src.schemas.bookings import BookingAddRequest, BookingAdd
+from src.models.hotels import HotelsOrm
+from src.models.rooms import RoomsOrm
+from src.models.room_inventory import RoomInventoryDailyOrm
+from src.models.users import UsersOrm
+from src.schemas.bulk import BulkUpsertResult
+from src.schemas.bookings import (
+    Booking,
+    BookingAddRequest,
+    BookingBulkRejection,
+    BookingBulkRequest,
+)
 from src.exeptions import ObjectNotFoundException, AllRoomsAreBookedException
-from sqlalchemy import select, func
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    and_,
+    bindparam,
+    case,
+    column,
+    delete,
+    exists,
+    func,
+    select,
+    text,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import date
 
 
+# Takes one unit of the room for every night of the stay and inserts the booking only
+# if it got all of them. ON CONFLICT locks an existing night row and checks
+# booked < capacity against its latest version, so concurrent bookings cannot oversell.
+# Written as text: SQLAlchemy does not cache compiled PostgreSQL upserts, and
+# compiling this one took longer than running it.
+BOOK_ROOM = text(
+    """
+    WITH room AS (
+        SELECT id, hotel_id, price, quantity FROM rooms WHERE id = :room_id
+    ),
+    nights AS (
+        INSERT INTO room_inventory_daily (room_id, night, booked, capacity)
+        SELECT room.id, CAST(:check_in AS DATE) + n, 1, room.quantity
+        FROM room, generate_series(0, CAST(:nights AS INTEGER) - 1) AS n
+        WHERE room.quantity > 0
+        ON CONFLICT (room_id, night) DO UPDATE
+        SET booked = room_inventory_daily.booked + 1
+        WHERE room_inventory_daily.booked < room_inventory_daily.capacity
+        RETURNING night
+    )
+    INSERT INTO bookings (user_id, hotel_id, room_id, check_in_date, check_out_date, price)
+    SELECT :user_id, room.hotel_id, room.id, :check_in, :check_out, room.price
+    FROM room
+    WHERE (SELECT count(*) FROM nights) = :nights
+    RETURNING *
+    """
+)
+
 
 class BookingsRepository(BaseRepository):
+    """
+    Bookings repository. Every write also updates room_inventory_daily,
+    so the per-night counters always match the bookings table.
+    """
+
     model = BookingsOrm
     mapper = BookingMapper
 
-    async def create_booking(self, booking_data: BookingAddRequest, user_id: int, db):
-        """Validate availability and create booking."""
-        # 1. Check if room exists
-        try:
-            room = await db.rooms.get_one(id=booking_data.room_id)
-        except ObjectNotFoundException:
+    def __init__(self, session):
+        super().__init__(session)
+        self.inventory = RoomInventoryRepository(session)
+
+    def invalidate_availability(self, bookings: Sequence[BaseModel]) -> None:
+        """Cached availability of the hotels and months of the bookings is stale."""
+        for booking in bookings:
+            self.invalidate(
+                *availability_tags(booking.check_in_date, booking.check_out_date),
+                *availability_tags(booking.check_in_date, booking.check_out_date, booking.hotel_id),
+            )
+
+    async def add(self, data: BaseModel | Sequence[BaseModel]):
+        booking = await super().add(data)
+        await self.inventory.book_stays([booking])
+        self.invalidate_availability([booking])
+        return booking
+
+    async def add_bulk(self, data: Sequence[BaseModel]) -> None:
+        await super().add_bulk(data)
+        await self.inventory.book_stays(data)
+        self.invalidate_availability(data)
+
+    async def upsert_bulk(
+        self,
+        data: Sequence[BaseModel],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str] | None = None,
+    ) -> BulkUpsertResult:
+        """
+        BaseRepository.upsert_bulk, moving the nights of the bookings it updated
+        like edit() does and taking those of the ones it inserted.
+        """
+        old_bookings = []
+        if update_cols and data:
+            keys = {tuple(getattr(item, col) for col in conflict_cols) for item in data}
+            key = tuple_(*(getattr(self.model, col) for col in conflict_cols))
+            old_bookings = await self.get_filtered(key.in_(keys))
+        result = await super().upsert_bulk(data, conflict_cols, update_cols)
+        if not result.ids:
+            return result
+        written = set(result.ids)
+        # Rows already holding the new values were not written, they keep their nights
+        old_bookings = [booking for booking in old_bookings if booking.id in written]
+        new_bookings = await self.get_filtered(self.model.id.in_(result.ids))
+        await self.inventory.release_stays(old_bookings)
+        await self.inventory.book_stays(new_bookings)
+        self.invalidate_availability([*old_bookings, *new_bookings])
+        return result
+
+    async def copy_bulk(self, data: Sequence[BaseModel]) -> int:
+        copied = await super().copy_bulk(data)
+        await self.inventory.book_stays(data)
+        self.invalidate_availability(data)
+        return copied
+
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> None:
+        old_bookings = await self.get_filtered(**filter_by)
+        await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+        new_bookings = await self.get_filtered(
+            self.model.id.in_([booking.id for booking in old_bookings])
+        )
+        await self.inventory.release_stays(old_bookings)
+        await self.inventory.book_stays(new_bookings)
+        self.invalidate_availability([*old_bookings, *new_bookings])
+
+    async def delete(self, **filter_by) -> None:
+        delete_stmt = delete(self.model).filter_by(**filter_by).returning(self.model)
+        result = await self.session.execute(delete_stmt)
+        deleted = [self.mapper.map_to_schema(model) for model in result.scalars().all()]
+        await self.inventory.release_stays(deleted)
+        self.invalidate_availability(deleted)
+
+    async def create_booking(self, booking_data: BookingAddRequest, user_id: int) -> Booking:
+        """
+        Book one unit of the room with the single BOOK_ROOM statement.
+
+        No row back means the room does not exist or a night is sold out. The nights
+        that were free have been taken by then, so the caller must roll back.
+        """
+        check_in, check_out = booking_data.check_in_date, booking_data.check_out_date
+        params = {
+            "room_id": booking_data.room_id,
+            "user_id": user_id,
+            "check_in": check_in,
+            "check_out": check_out,
+            "nights": (check_out - check_in).days,
+        }
+        result = await self.session.execute(select(self.model).from_statement(BOOK_ROOM), params)
+        model = result.scalars().one_or_none()
+        if model is not None:
+            booking = self.mapper.map_to_schema(model)
+            self.invalidate_availability([booking])
+            return booking
+
+        room_exists = select(exists().where(RoomsOrm.id == booking_data.room_id))
+        if not (await self.session.execute(room_exists)).scalar_one():
             raise ObjectNotFoundException
+        raise AllRoomsAreBookedException
+
+    async def add_bulk_checked(
+        self, data: Sequence[BookingBulkRequest]
+    ) -> list[BookingBulkRejection]:
+        """
+        Insert the valid rows of a bulk request and return why the others were rejected.
+
+        The rows are checked in the database, joined against users, hotels, rooms and
+        the per-night counters, which are locked first so the check holds until commit.
+        Rows compete for the remaining units in request order: a stay is sold out when,
+        on one of its nights, the booked units plus the earlier valid rows of the batch
+        reach the capacity. Rows rejected that way still count against later rows, so
+        the check never oversells but may turn away a row that would have fit.
+        """
+        if not data:
+            return []
+        await self.inventory.lock_nights(data)
+        rejections = await self.session.execute(self._bulk_rejections(data))
+        rejected = [BookingBulkRejection(index=i, reason=r) for i, r in rejections.all()]
+        rejected_indexes = {rejection.index for rejection in rejected}
+        valid = [row for i, row in enumerate(data) if i not in rejected_indexes]
+        await self.copy_bulk(valid)
+        return rejected
 
-        # 2. Check room availability for the selected dates
-        available_rooms = await db.rooms.get_filtered_by_time(
-            hotel_id=room.hotel_id,
-            date_from=booking_data.check_in_date,
-            date_to=booking_data.check_out_date,
-        )
-        available_ids = [r.id for r in available_rooms]
-        if booking_data.room_id not in available_ids:
-            raise AllRoomsAreBookedException
-
-        # 3. Create booking
-        booking = await self.add(
-            BookingAdd(
-                **booking_data.model_dump(),
-                hotel_id=room.hotel_id,
-                user_id=user_id,
-                price=room.price,
+    @staticmethod
+    def _bulk_rejections(data: Sequence[BookingBulkRequest]):
+        """(index, reason) of every row of the bulk request that cannot be inserted."""
+        incoming = (
+            func.unnest(
+                bindparam("user_ids", [b.user_id for b in data], type_=ARRAY(BigInteger)),
+                bindparam("hotel_ids", [b.hotel_id for b in data], type_=ARRAY(BigInteger)),
+                bindparam("room_ids", [b.room_id for b in data], type_=ARRAY(BigInteger)),
+                bindparam("check_ins", [b.check_in_date for b in data], type_=ARRAY(Date)),
+                bindparam("check_outs", [b.check_out_date for b in data], type_=ARRAY(Date)),
             )
+            .table_valued(
+                column("user_id", BigInteger),
+                column("hotel_id", BigInteger),
+                column("room_id", BigInteger),
+                column("check_in", Date),
+                column("check_out", Date),
+                with_ordinality="ordinality",
+            )
+            .render_derived()
         )
-        return booking
+        reason = case(
+            (incoming.c.check_out <= incoming.c.check_in, "invalid_date_range"),
+            (UsersOrm.id.is_(None), "user_not_found"),
+            (HotelsOrm.id.is_(None), "hotel_not_found"),
+            (RoomsOrm.id.is_(None), "room_not_found"),
+            (RoomsOrm.hotel_id != incoming.c.hotel_id, "room_not_in_hotel"),
+        )
+        checked = (
+            select(
+                (incoming.c.ordinality - 1).label("index"),
+                incoming.c.room_id,
+                incoming.c.check_in,
+                incoming.c.check_out,
+                reason.label("reason"),
+            )
+            .select_from(incoming)
+            .outerjoin(UsersOrm, UsersOrm.id == incoming.c.user_id)
+            .outerjoin(HotelsOrm, HotelsOrm.id == incoming.c.hotel_id)
+            .outerjoin(RoomsOrm, RoomsOrm.id == incoming.c.room_id)
+            .cte("checked")
+        )
+
+        # Every night of the valid rows, with the number of valid rows up to this
+        # one that occupy the same room on that night
+        offsets = (
+            func.generate_series(0, checked.c.check_out - checked.c.check_in - 1)
+            .table_valued("n")
+            .render_derived()
+            .lateral()
+        )
+        night = (checked.c.check_in + offsets.c.n).label("night")
+        nights = (
+            select(
+                checked.c.index,
+                checked.c.room_id,
+                night,
+                func.count()
+                .over(partition_by=(checked.c.room_id, night), order_by=checked.c.index)
+                .label("batch_booked"),
+            )
+            .select_from(checked)
+            .join(offsets, true())
+            .where(checked.c.reason.is_(None))
+            .subquery("nights")
+        )
+        inventory = RoomInventoryDailyOrm
+        sold_out = (
+            select(nights.c.index)
+            .join(
+                inventory,
+                and_(inventory.room_id == nights.c.room_id, inventory.night == nights.c.night),
+            )
+            .where(inventory.booked + nights.c.batch_booked > inventory.capacity)
+        )
+        return (
+            select(checked.c.index, func.coalesce(checked.c.reason, "sold_out"))
+            .where(checked.c.reason.is_not(None) | checked.c.index.in_(sold_out))
+            .order_by(checked.c.index)
+        )
+
+    async def get_page(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        cursor: str | None = None,
+        **filter_by,
+    ):
+        """Bookings matching filter_by in (check_in_date, id) order, by offset or by cursor."""
+        query = seek_after(
+            select(self.model).filter_by(**filter_by),
+            self.model.check_in_date,
+            self.model.id,
+            cursor,
+        )
+        query = query.limit(limit).offset(offset)
+        res = await self.session.execute(query)
+        return [self.mapper.map_to_schema(model) for model in res.scalars().all()]
+
+    async def get_overlapping(self, date_from: date, date_to: date, **filter_by):
+        """Bookings of the rooms matching filter_by with a night in [date_from, date_to)."""
+        return await self.get_filtered(stay_overlaps(date_from, date_to), **filter_by)
 
     async def get_bookings_with_today_checkin(self):
-        query = select(self.model).where(func.date(self.model.check_in_date) == date.today())
+        query = select(self.model).where(self.model.check_in_date == date.today())
         res = await self.session.execute(query)
         return [self.mapper.map_to_schema(model) for model in res.scalars().all()]
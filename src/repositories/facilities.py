@@ -1,19 +1,80 @@
+from typing import Sequence
+
+from pydantic import BaseModel
 from src.models.facilities import RoomFacilitiesOrm
+from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
 from src.models.facilities import FacilitiesOrm
 from src.repositories.mappers.mappers import FacilityMapper, FacilityRoomMapper
-from sqlalchemy import select, delete, insert
+from src.schemas.bulk import BulkUpsertResult
+from sqlalchemy import BigInteger, select, delete, insert, func, update, literal
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 
 
 class FacilitiesRepository(BaseRepository):
     model = FacilitiesOrm
     mapper = FacilityMapper
+    cached = True
 
 
 class RoomFacilitiesRepository(BaseRepository):
+    """
+    Room facilities repository. Every write also refreshes rooms.facility_ids,
+    so the array always matches this table.
+    """
+
     model = RoomFacilitiesOrm
     mapper = FacilityRoomMapper
 
+    async def add_bulk(self, data: Sequence[BaseModel]) -> None:
+        await super().add_bulk(data)
+        await self.sync_facility_ids(list({item.room_id for item in data}))
+
+    async def copy_bulk(self, data: Sequence[BaseModel]) -> int:
+        copied = await super().copy_bulk(data)
+        await self.sync_facility_ids(list({item.room_id for item in data}))
+        return copied
+
+    async def upsert_bulk(
+        self,
+        data: Sequence[BaseModel],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str] | None = None,
+    ) -> BulkUpsertResult:
+        result = await super().upsert_bulk(data, conflict_cols, update_cols)
+        await self.sync_facility_ids(list({item.room_id for item in data}))
+        return result
+
+    async def delete(self, **filter_by) -> None:
+        delete_stmt = delete(self.model).filter_by(**filter_by).returning(self.model.room_id)
+        result = await self.session.execute(delete_stmt)
+        await self.sync_facility_ids(list(set(result.scalars().all())))
+
+    async def sync_facility_ids(self, room_ids) -> None:
+        """Copy the facilities of the given rooms (a list or a select) into rooms.facility_ids."""
+        facility_ids = (
+            select(
+                func.coalesce(
+                    func.array_agg(
+                        aggregate_order_by(self.model.facility_id, self.model.facility_id)
+                    ),
+                    literal([], ARRAY(BigInteger)),
+                )
+            )
+            .where(self.model.room_id == RoomsOrm.id)
+            .scalar_subquery()
+        )
+        sync_stmt = (
+            update(RoomsOrm)
+            .where(RoomsOrm.id.in_(room_ids))
+            .values(facility_ids=facility_ids)
+            .returning(RoomsOrm.id)
+        )
+        result = await self.session.execute(sync_stmt)
+        # Cached rooms embed their facilities, and room lists filter on them
+        table = RoomsOrm.__tablename__
+        self.invalidate(table, *(f"{table}:{room_id}" for room_id in result.scalars()))
+
     async def set_room_facilities(self, room_id: int, facility_ids: list[int]):
         get_current_facilities_id_query = select(self.model.facility_id).where(
             self.model.room_id == room_id
@@ -34,6 +95,8 @@ class RoomFacilitiesRepository(BaseRepository):
                 [{"room_id": room_id, "facility_id": facility_id} for facility_id in ids_to_add]
             )
             await self.session.execute(add_stmt)
+        if ids_to_delete or ids_to_add:
+            await self.sync_facility_ids([room_id])
 
     # async def set_room_facilities(self, room_id: int, facility_ids: list[int]):
     #     # 1. Fetch the room object along with its currently associated facilities
@@ -1,15 +1,155 @@
+from typing import Sequence
+
+from pydantic import BaseModel
 from src.repositories.base import BaseRepository
 from src.models.hotels import HotelsOrm
 from src.models.rooms import RoomsOrm
-from sqlalchemy import select
+from src.models.room_inventory import RoomInventoryDailyOrm
+from sqlalchemy import Select, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from src.repositories.mappers.mappers import HotelMapper
-from src.repositories.utils import room_ids_for_booking
+from src.repositories.utils import (
+    SEARCH_CONFIG,
+    availability_tags,
+    hotel_own_tsvector,
+    hotel_availability_summary,
+    hotel_search_tsvector,
+    room_ids_for_booking,
+    seek_after,
+)
+from src.schemas.bulk import BulkUpsertResult
+from src.schemas.hotels import HotelSearchResult, HotelWithAvailability
+from src.config import settings
+from src.exeptions import InvalidCursorException
 from datetime import date
 
 
 class HotelsRepository(BaseRepository):
+    """
+    Hotels repository. hotels.search_vector also covers the rooms of the hotel,
+    so every hotel or room write refreshes it through refresh_search_vector.
+    """
+
     model = HotelsOrm
     mapper = HotelMapper
+    cached = True
+
+    async def add(self, data: BaseModel | Sequence[BaseModel]):
+        hotel = await super().add(data)
+        await self.refresh_search_vector([hotel.id])
+        return hotel
+
+    async def add_bulk(self, data: Sequence[BaseModel]) -> None:
+        await super().add_bulk(data)
+        await self.refresh_search_vector(
+            select(self.model.id).where(self.model.search_vector.is_(None))
+        )
+
+    async def copy_bulk(self, data: Sequence[BaseModel]) -> int:
+        copied = await super().copy_bulk(data)
+        await self.refresh_search_vector(
+            select(self.model.id).where(self.model.search_vector.is_(None))
+        )
+        return copied
+
+    async def upsert_bulk(
+        self,
+        data: Sequence[BaseModel],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str] | None = None,
+    ) -> BulkUpsertResult:
+        result = await super().upsert_bulk(data, conflict_cols, update_cols)
+        await self.refresh_search_vector(result.ids)
+        return result
+
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> None:
+        await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+        await self.refresh_search_vector(select(self.model.id).filter_by(**filter_by))
+
+    async def refresh_search_vector(self, hotel_ids) -> None:
+        """Recompute search_vector of the hotels with the given ids (a list or a select)."""
+        refresh_stmt = (
+            update(self.model)
+            .where(self.model.id.in_(hotel_ids))
+            .values(search_vector=hotel_search_tsvector())
+        )
+        await self.session.execute(refresh_stmt)
+
+    async def search(self, text: str, limit: int, offset: int) -> list[HotelSearchResult]:
+        """
+        Hotels whose title, location or rooms match the web-search style query,
+        best matches first, each with its matching rooms.
+
+        The hotels are found through the GIN index on hotels.search_vector. A room
+        matches when the query matches its own text together with the hotel's, so
+        "sea view spa" finds the spa rooms of a hotel located by the sea.
+        """
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        rank = func.ts_rank(self.model.search_vector, tsquery)
+        room_rank = func.ts_rank(RoomsOrm.search_vector, tsquery)
+        room = func.json_build_object(
+            "id", RoomsOrm.id,
+            "hotel_id", RoomsOrm.hotel_id,
+            "title", RoomsOrm.title,
+            "description", RoomsOrm.description,
+            "price", RoomsOrm.price,
+            "quantity", RoomsOrm.quantity,
+        )  # fmt: skip
+        matching_rooms = (
+            select(func.json_agg(aggregate_order_by(room, room_rank.desc(), RoomsOrm.id)))
+            .where(
+                RoomsOrm.hotel_id == self.model.id,
+                hotel_own_tsvector().op("||")(RoomsOrm.search_vector).op("@@")(tsquery),
+            )
+            .scalar_subquery()
+        )
+        query = (
+            select(self.model, rank.label("rank"), matching_rooms.label("rooms"))
+            .where(self.model.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), self.model.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(query)
+        return [
+            HotelSearchResult(
+                **self.mapper.map_to_schema(hotel).model_dump(), rank=rank, rooms=rooms or []
+            )
+            for hotel, rank, rooms in result.all()
+        ]
+
+    def _filter_by_text(
+        self,
+        query: Select,
+        title: str | None,
+        location: str | None,
+        fuzzy: bool,
+        cursor: str | None = None,
+    ) -> Select:
+        """
+        Substring match on title/location ordered by (title, id), or with fuzzy=True
+        a typo-tolerant match ranked by trigram word similarity. Both are served by
+        the pg_trgm GIN indexes. Only the (title, id) order supports a cursor.
+        """
+        if not fuzzy:
+            if title:
+                query = query.filter(self.model.title.ilike(f"%{title}%"))
+            if location:
+                query = query.filter(self.model.location.ilike(f"%{location}%"))
+            return seek_after(query, self.model.title, self.model.id, cursor)
+        if cursor is not None:
+            raise InvalidCursorException
+
+        # column %> 'text' holds when word_similarity('text', column) exceeds
+        # pg_trgm.word_similarity_threshold (0.6 by default), so "Sochy" finds "Sochi"
+        rank = literal(0.0)
+        if title:
+            query = query.filter(self.model.title.op("%>")(title))
+            rank = rank + func.word_similarity(title, self.model.title)
+        if location:
+            query = query.filter(self.model.location.op("%>")(location))
+            rank = rank + func.word_similarity(location, self.model.location)
+        return query.order_by(rank.desc(), self.model.id)
 
     async def get_all(
         self,
@@ -17,12 +157,10 @@ class HotelsRepository(BaseRepository):
         location: str | None,
         limit: int,
         offset: int,
+        fuzzy: bool = False,
+        cursor: str | None = None,
     ):
-        query = select(self.model)
-        if title:
-            query = query.filter(self.model.title.ilike(f"%{title}%"))
-        if location:
-            query = query.filter(self.model.location.ilike(f"%{location}%"))
+        query = self._filter_by_text(select(self.model), title, location, fuzzy, cursor)
         query = query.limit(limit).offset(offset)
         result = await self.session.execute(query)
         return [self.mapper.map_to_schema(model) for model in result.scalars().all()]
@@ -36,7 +174,66 @@ class HotelsRepository(BaseRepository):
         offset: int = 0,
         title: str | None = None,
         location: str | None = None,
+        fuzzy: bool = False,
+        cursor: str | None = None,
+        with_summary: bool = False,
+        facility_ids: list[int] | None = None,
+    ):
+        """
+        Cached _get_filtered_by_time. Any hotel can enter or leave the results, so
+        the entries are invalidated by a booking write of any hotel in one of the
+        months of the stay, and by hotel, room or inventory writes.
+        """
+        params = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "available": available,
+            "limit": limit,
+            "offset": offset,
+            "title": title,
+            "location": location,
+            "fuzzy": fuzzy,
+            "cursor": cursor,
+            "with_summary": with_summary,
+            "facility_ids": facility_ids,
+        }
+        return await self.cached_read(
+            "available",
+            params,
+            lambda: self._get_filtered_by_time(**params),
+            tags=[
+                *availability_tags(date_from, date_to),
+                self.model.__tablename__,
+                RoomsOrm.__tablename__,
+                RoomInventoryDailyOrm.__tablename__,
+            ],
+            schema=HotelWithAvailability if with_summary else None,
+            many=True,
+            ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+            # The hotels of the page for GET /hotels/{id}, in the same round trip
+            related=self.read_through_entries,
+        )
+
+    async def _get_filtered_by_time(
+        self,
+        date_from: date,
+        date_to: date,
+        available: bool = True,
+        limit: int = 10,
+        offset: int = 0,
+        title: str | None = None,
+        location: str | None = None,
+        fuzzy: bool = False,
+        cursor: str | None = None,
+        with_summary: bool = False,
+        facility_ids: list[int] | None = None,
     ):
+        """
+        Hotels with (or, with available=False, without) bookable rooms in the date range.
+        facility_ids restricts the rooms to those having all of the facilities.
+        with_summary=True also returns the number of room units left and the lowest
+        price of an available room per hotel, computed in the same query.
+        """
         rooms_ids_to_get = room_ids_for_booking(date_from, date_to)
         hotels_ids_with_rooms = select(RoomsOrm.hotel_id)
         if available:
@@ -45,13 +242,29 @@ class HotelsRepository(BaseRepository):
             hotels_ids_with_rooms = hotels_ids_with_rooms.where(
                 RoomsOrm.id.notin_(rooms_ids_to_get)
             )
+        if facility_ids:
+            hotels_ids_with_rooms = hotels_ids_with_rooms.where(
+                RoomsOrm.facility_ids.contains(facility_ids)
+            )
 
-        query = select(self.model).where(HotelsOrm.id.in_(hotels_ids_with_rooms))
-        if title:
-            query = query.filter(self.model.title.ilike(f"%{title}%"))
-        if location:
-            query = query.filter(self.model.location.ilike(f"%{location}%"))
+        query = select(self.model)
+        if with_summary:
+            summary = hotel_availability_summary(date_from, date_to, facility_ids)
+            query = query.add_columns(summary.c.rooms_left, summary.c.min_price).join(
+                summary, true()
+            )
+        query = query.where(HotelsOrm.id.in_(hotels_ids_with_rooms))
+        query = self._filter_by_text(query, title, location, fuzzy, cursor)
         query = query.limit(limit).offset(offset)
 
         result = await self.session.execute(query)
+        if with_summary:
+            return [
+                HotelWithAvailability(
+                    **self.mapper.map_to_schema(hotel).model_dump(),
+                    rooms_left=rooms_left,
+                    min_price=min_price,
+                )
+                for hotel, rooms_left, min_price in result.all()
+            ]
         return [self.mapper.map_to_schema(model) for model in result.scalars().all()]
@@ -1,5 +1,6 @@
+from functools import cache
 from typing import ClassVar, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class DataMapper:
@@ -17,3 +18,22 @@ class DataMapper:
     def map_to_orm(cls, data):
         """Pydantic schema → ORM model"""
         return cls.db_model(**data.model_dump())
+
+    @classmethod
+    def dump_cached(
+        cls, data: Any, schema: type[BaseModel] | None = None, many: bool = False
+    ) -> str:
+        """Schema (a list of them with many=True) → cache entry payload"""
+        return cls._cache_adapter(schema or cls.schema, many).dump_json(data).decode()
+
+    @classmethod
+    def load_cached(
+        cls, payload: str, schema: type[BaseModel] | None = None, many: bool = False
+    ) -> Any:
+        """Cache entry payload → schema (the mapper's own unless given), or a list of them"""
+        return cls._cache_adapter(schema or cls.schema, many).validate_json(payload)
+
+    @staticmethod
+    @cache
+    def _cache_adapter(schema: type[BaseModel], many: bool) -> TypeAdapter:
+        return TypeAdapter(list[schema] if many else schema)
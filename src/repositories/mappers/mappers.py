@@ -4,11 +4,13 @@ from src.models.hotels import HotelsOrm
 from src.models.rooms import RoomsOrm
 from src.models.facilities import FacilitiesOrm, RoomFacilitiesOrm
 from src.models.bookings import BookingsOrm
+from src.models.room_inventory import RoomInventoryDailyOrm
 from src.schemas.hotels import Hotel
 from src.schemas.users import User
 from src.schemas.rooms import Room
 from src.schemas.facilities import Facility, FacilityRoom
 from src.schemas.bookings import Booking
+from src.schemas.room_inventory import RoomInventoryDaily
 
 
 class HotelMapper(DataMapper):
@@ -39,3 +41,8 @@ class FacilityRoomMapper(DataMapper):
 class BookingMapper(DataMapper):
     db_model = BookingsOrm
     schema = Booking
+
+
+class RoomInventoryMapper(DataMapper):
+    db_model = RoomInventoryDailyOrm
+    schema = RoomInventoryDaily
@@ -0,0 +1,176 @@
+from datetime import date
+from typing import Protocol, Sequence
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    bindparam,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from src.models.bookings import BookingsOrm
+from src.models.room_inventory import RoomInventoryDailyOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.base import BaseRepository
+from src.repositories.mappers.mappers import RoomInventoryMapper
+from src.repositories.utils import sold_out_nights
+
+
+class Stay(Protocol):
+    room_id: int
+    check_in_date: date
+    check_out_date: date
+
+
+class RoomInventoryRepository(BaseRepository):
+    model = RoomInventoryDailyOrm
+    mapper = RoomInventoryMapper
+
+    @staticmethod
+    def _stays_table(stays: Sequence[Stay]):
+        """Pass stays to the database as one (room_id, check_in, check_out) rowset."""
+        return (
+            func.unnest(
+                bindparam("room_ids", [s.room_id for s in stays], type_=ARRAY(BigInteger)),
+                bindparam("check_ins", [s.check_in_date for s in stays], type_=ARRAY(Date)),
+                bindparam("check_outs", [s.check_out_date for s in stays], type_=ARRAY(Date)),
+            )
+            .table_valued(
+                column("room_id", BigInteger),
+                column("check_in", Date),
+                column("check_out", Date),
+            )
+            .render_derived()
+        )
+
+    @staticmethod
+    def _nights_per_room(stays_table):
+        """
+        Expand a (room_id, check_in, check_out) rowset into (room_id, night, booked),
+        where booked is the number of stays occupying the room on that night.
+        """
+        # date - date is an integer number of days, date + integer is a date
+        offsets = (
+            func.generate_series(0, stays_table.c.check_out - stays_table.c.check_in - 1)
+            .table_valued("n")
+            .render_derived()
+            .lateral()
+        )
+        night = (stays_table.c.check_in + offsets.c.n).label("night")
+        return (
+            select(stays_table.c.room_id, night, func.count().label("booked"))
+            .select_from(stays_table)
+            .join(offsets, true())
+            .group_by(stays_table.c.room_id, night)
+            .subquery("nights")
+        )
+
+    async def book_stays(self, stays: Sequence[Stay]) -> None:
+        """Add the nights of the given stays to the inventory counters."""
+        if not stays:
+            return
+        nights = self._nights_per_room(self._stays_table(stays))
+        rows = select(nights.c.room_id, nights.c.night, nights.c.booked, RoomsOrm.quantity).join(
+            RoomsOrm, RoomsOrm.id == nights.c.room_id
+        )
+        insert_stmt = insert(self.model).from_select(
+            ["room_id", "night", "booked", "capacity"], rows
+        )
+        upsert_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.night],
+            set_={"booked": self.model.booked + insert_stmt.excluded.booked},
+        )
+        await self.session.execute(upsert_stmt)
+
+    async def lock_nights(self, stays: Sequence[Stay]) -> None:
+        """
+        Lock the counters of every night of the given stays for the rest of the
+        transaction, creating the missing ones, so that bookings checked against
+        them cannot be outrun by a concurrent booking. Stays of unknown rooms are
+        skipped. Rows are locked in (room_id, night) order to avoid deadlocks.
+        """
+        if not stays:
+            return
+        nights = self._nights_per_room(self._stays_table(stays))
+        rows = (
+            select(nights.c.room_id, nights.c.night, literal(0), RoomsOrm.quantity)
+            .join(RoomsOrm, RoomsOrm.id == nights.c.room_id)
+            .order_by(nights.c.room_id, nights.c.night)
+        )
+        insert_stmt = insert(self.model).from_select(
+            ["room_id", "night", "booked", "capacity"], rows
+        )
+        # A no-op update takes the row lock on the nights that already exist
+        lock_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.night],
+            set_={"booked": self.model.booked},
+        )
+        await self.session.execute(lock_stmt)
+
+    async def release_stays(self, stays: Sequence[Stay]) -> None:
+        """Subtract the nights of the given stays from the inventory counters."""
+        if not stays:
+            return
+        nights = self._nights_per_room(self._stays_table(stays))
+        release_stmt = (
+            update(self.model)
+            .where(self.model.room_id == nights.c.room_id, self.model.night == nights.c.night)
+            .values(booked=self.model.booked - nights.c.booked)
+        )
+        await self.session.execute(release_stmt)
+
+    async def rebuild(self, date_from: date | None = None, date_to: date | None = None) -> None:
+        """
+        Recompute the counters from the bookings table, for every night or only for
+        the nights in [date_from, date_to); either bound may be left open.
+        Used to backfill or reconcile the inventory after out-of-band writes.
+        """
+        check_in = BookingsOrm.check_in_date
+        check_out = BookingsOrm.check_out_date
+        stale_nights = delete(self.model)
+        stays = select(BookingsOrm.room_id)
+        # Only the nights inside the window are recomputed
+        if date_from:
+            check_in = func.greatest(check_in, date_from, type_=Date)
+            stale_nights = stale_nights.where(self.model.night >= date_from)
+            stays = stays.where(BookingsOrm.check_out_date > date_from)
+        if date_to:
+            check_out = func.least(check_out, date_to, type_=Date)
+            stale_nights = stale_nights.where(self.model.night < date_to)
+            stays = stays.where(BookingsOrm.check_in_date < date_to)
+        stays_table = stays.add_columns(
+            check_in.label("check_in"), check_out.label("check_out")
+        ).subquery("stays")
+        nights = self._nights_per_room(stays_table)
+        rows = select(nights.c.room_id, nights.c.night, nights.c.booked, RoomsOrm.quantity).join(
+            RoomsOrm, RoomsOrm.id == nights.c.room_id
+        )
+        await self.session.execute(stale_nights)
+        await self.session.execute(
+            insert(self.model).from_select(["room_id", "night", "booked", "capacity"], rows)
+        )
+        # The rebuilt nights may belong to any hotel
+        self.invalidate(self.model.__tablename__)
+
+    async def sync_capacity(self, room_ids) -> None:
+        """Copy rooms.quantity into the capacity of every stored night of the rooms."""
+        sync_stmt = (
+            update(self.model)
+            .where(self.model.room_id == RoomsOrm.id, RoomsOrm.id.in_(room_ids))
+            .values(capacity=RoomsOrm.quantity)
+        )
+        await self.session.execute(sync_stmt)
+
+    async def has_vacancy(self, room_id: int, date_from: date, date_to: date) -> bool:
+        """True if no night in [date_from, date_to) of the room is sold out."""
+        query = select(~exists(sold_out_nights(date_from, date_to, room_id)))
+        result = await self.session.execute(query)
+        return result.scalar_one()
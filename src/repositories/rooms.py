@@ -1,35 +1,222 @@
 from datetime import date
+from typing import Sequence
 from src.repositories.base import BaseRepository
+from src.models.facilities import FacilitiesOrm, RoomFacilitiesOrm
 from src.models.rooms import RoomsOrm
-from src.repositories.utils import room_ids_for_booking
+from src.models.room_inventory import RoomInventoryDailyOrm
+from src.repositories.hotels import HotelsRepository
+from src.repositories.room_inventory import RoomInventoryRepository
+from src.repositories.utils import availability_tags, room_ids_for_booking
 from sqlalchemy.orm import joinedload
-from sqlalchemy import select
+from sqlalchemy import BigInteger, Integer, String, bindparam, column, func, insert, literal
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from pydantic import BaseModel
 from src.repositories.mappers.mappers import RoomMapper
-from src.schemas.rooms import RoomWithFacilities
+from src.schemas.bulk import BulkUpsertResult
+from src.schemas.rooms import RoomAddBulk, RoomWithFacilities
+from src.config import settings
 
 
 class RoomsRepository(BaseRepository):
-    model = RoomsOrm
-    mapper = RoomMapper
     """
-    with rooms_count as (
-        select room_id, count(*) as rooms_booked from bookings 
-        where check_in_date  <= :date_to
-        and check_out_date >= :date_from
-        group by room_id
-    ),
-    available_rooms as(
-        select rooms.id as room_id, quantity - coalesce(rooms_booked, 0) as rooms_available from rooms
-        left join rooms_count on rooms.id = rooms_count.room_id 
-
-    )
-    select * from available_rooms
-    where rooms_available > 0 and room_id in (
-        select id from rooms where hotel_id = {hotel_id}
-    )
+    Rooms repository. Room text is part of the hotel search document, so every
+    write refreshes hotels.search_vector of the affected hotels.
     """
 
-    async def get_filtered_by_time(self, hotel_id: int, date_from: date, date_to: date):
+    model = RoomsOrm
+    mapper = RoomMapper
+    cached = True
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.hotels = HotelsRepository(session)
+
+    async def add(self, data: BaseModel | Sequence[BaseModel]):
+        room = await super().add(data)
+        await self.hotels.refresh_search_vector([room.hotel_id])
+        return room
+
+    async def add_bulk(self, data: Sequence[BaseModel]) -> None:
+        await super().add_bulk(data)
+        await self.hotels.refresh_search_vector(list({room.hotel_id for room in data}))
+
+    async def copy_bulk(self, data: Sequence[BaseModel]) -> int:
+        copied = await super().copy_bulk(data)
+        await self.hotels.refresh_search_vector(list({room.hotel_id for room in data}))
+        return copied
+
+    async def upsert_bulk(
+        self,
+        data: Sequence[BaseModel],
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str] | None = None,
+    ) -> BulkUpsertResult:
+        old_hotel_ids = set()
+        if update_cols and "hotel_id" in update_cols and data:
+            # Rooms moving to another hotel leave their words in the old one otherwise
+            keys = {tuple(getattr(room, col) for col in conflict_cols) for room in data}
+            key = tuple_(*(getattr(self.model, col) for col in conflict_cols))
+            query = select(self.model.hotel_id).where(key.in_(keys))
+            old_hotel_ids = set((await self.session.execute(query)).scalars().all())
+        result = await super().upsert_bulk(data, conflict_cols, update_cols)
+        query = select(self.model.hotel_id).where(self.model.id.in_(result.ids))
+        new_hotel_ids = (await self.session.execute(query)).scalars().all()
+        await self.hotels.refresh_search_vector(list(old_hotel_ids | set(new_hotel_ids)))
+        if update_cols and "quantity" in update_cols:
+            await RoomInventoryRepository(self.session).sync_capacity(result.ids)
+        return result
+
+    async def add_bulk_with_facilities(self, data: Sequence[RoomAddBulk]) -> tuple[int, int]:
+        """
+        Insert rooms together with their facility links in one statement, and return
+        the number of rooms and links created. The hotels and facilities must exist.
+
+        with incoming as (select * from unnest(:hotel_ids, ...) with ordinality),
+        numbered as (select nextval('rooms_id_seq') as id, * from incoming),
+        new_rooms as (insert into rooms select ... from numbered returning id),
+        links as (
+            insert into room_facilities (room_id, facility_id)
+            select new_rooms.id, facility_id
+            from new_rooms join numbered using (id) join incoming_links using (idx)
+            returning id
+        )
+        select (select count(*) from new_rooms), (select count(*) from links)
+
+        Room ids are drawn before the insert, so that the links can be matched to the
+        rooms of the request.
+        """
+        if not data:
+            return 0, 0
+        incoming = (
+            func.unnest(
+                bindparam("hotel_ids", [r.hotel_id for r in data], type_=ARRAY(BigInteger)),
+                bindparam("titles", [r.title for r in data], type_=ARRAY(String)),
+                bindparam("descriptions", [r.description for r in data], type_=ARRAY(String)),
+                bindparam("prices", [r.price for r in data], type_=ARRAY(Integer)),
+                bindparam("quantities", [r.quantity for r in data], type_=ARRAY(Integer)),
+            )
+            .table_valued(
+                column("hotel_id", BigInteger),
+                column("title", String),
+                column("description", String),
+                column("price", Integer),
+                column("quantity", Integer),
+                with_ordinality="idx",
+            )
+            .render_derived()
+        )
+        room_links = [
+            (idx, facility_id)
+            for idx, room in enumerate(data, start=1)
+            for facility_id in sorted(set(room.facilities))
+        ]
+        incoming_links = (
+            func.unnest(
+                bindparam("link_rooms", [idx for idx, _ in room_links], type_=ARRAY(BigInteger)),
+                bindparam("link_facilities", [f for _, f in room_links], type_=ARRAY(BigInteger)),
+            )
+            .table_valued(column("idx", BigInteger), column("facility_id", BigInteger))
+            .render_derived()
+        )
+
+        facility_ids = (
+            select(
+                func.array_agg(
+                    aggregate_order_by(incoming_links.c.facility_id, incoming_links.c.facility_id)
+                )
+            )
+            .where(incoming_links.c.idx == incoming.c.idx)
+            .scalar_subquery()
+        )
+        columns = ["hotel_id", "title", "description", "price", "quantity"]
+        numbered = select(
+            func.nextval(func.pg_get_serial_sequence(self.model.__tablename__, "id")).label("id"),
+            incoming.c.idx,
+            *(incoming.c[name] for name in columns),
+            func.coalesce(facility_ids, literal([], ARRAY(BigInteger))).label("facility_ids"),
+        ).cte("numbered")
+        new_rooms = (
+            insert(self.model)
+            .from_select(
+                ["id", *columns, "facility_ids"],
+                select(
+                    numbered.c.id, *(numbered.c[name] for name in columns), numbered.c.facility_ids
+                ),
+            )
+            .returning(self.model.id)
+            .cte("new_rooms")
+        )
+        links = (
+            insert(RoomFacilitiesOrm)
+            .from_select(
+                ["room_id", "facility_id"],
+                select(new_rooms.c.id, incoming_links.c.facility_id)
+                .join(numbered, numbered.c.id == new_rooms.c.id)
+                .join(incoming_links, incoming_links.c.idx == numbered.c.idx),
+            )
+            .returning(RoomFacilitiesOrm.id)
+            .cte("links")
+        )
+        counts = select(
+            select(func.count()).select_from(new_rooms).scalar_subquery(),
+            select(func.count()).select_from(links).scalar_subquery(),
+        )
+        rooms_created, links_created = (await self.session.execute(counts)).one()
+        self.invalidate_rows([])
+        await self.hotels.refresh_search_vector(list({room.hotel_id for room in data}))
+        return rooms_created, links_created
+
+    async def delete(self, **filter_by) -> None:
+        delete_stmt = (
+            delete(self.model).filter_by(**filter_by).returning(self.model.id, self.model.hotel_id)
+        )
+        rooms = (await self.session.execute(delete_stmt)).all()
+        self.invalidate_rows([room_id for room_id, _ in rooms])
+        await self.hotels.refresh_search_vector(list({hotel_id for _, hotel_id in rooms}))
+
+    async def get_filtered_by_time(
+        self,
+        hotel_id: int,
+        date_from: date,
+        date_to: date,
+        facility_ids: list[int] | None = None,
+    ):
+        """
+        Available rooms of the hotel, optionally only those with all of facility_ids.
+        Cached until a booking write of the hotel in one of the months of the stay,
+        or a room, facility or inventory write.
+        """
+        return await self.cached_read(
+            "available",
+            {
+                "hotel_id": hotel_id,
+                "date_from": date_from,
+                "date_to": date_to,
+                "facility_ids": facility_ids,
+            },
+            lambda: self._get_filtered_by_time(hotel_id, date_from, date_to, facility_ids),
+            tags=[
+                *availability_tags(date_from, date_to, hotel_id),
+                self.model.__tablename__,
+                FacilitiesOrm.__tablename__,
+                RoomInventoryDailyOrm.__tablename__,
+            ],
+            schema=RoomWithFacilities,
+            many=True,
+            ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+            related=lambda rooms: self.read_through_entries(
+                rooms, RoomWithFacilities, [FacilitiesOrm.__tablename__]
+            ),
+        )
+
+    async def _get_filtered_by_time(
+        self,
+        hotel_id: int,
+        date_from: date,
+        date_to: date,
+        facility_ids: list[int] | None = None,
+    ):
         rooms_ids_to_get = room_ids_for_booking(
             date_from=date_from, date_to=date_to, hotel_id=hotel_id
         )
@@ -39,6 +226,8 @@ class RoomsRepository(BaseRepository):
             .options(joinedload(self.model.facilities))
             .filter(self.model.id.in_(rooms_ids_to_get))
         )
+        if facility_ids:
+            query = query.filter(self.model.facility_ids.contains(facility_ids))
         result = await self.session.execute(query)
         return [
             RoomWithFacilities.model_validate(model, from_attributes=True)
@@ -46,9 +235,32 @@ class RoomsRepository(BaseRepository):
         ]
 
     async def get_one_or_none(self, **filter_by):
+        # The entry embeds the facilities: any facility write invalidates it, and
+        # RoomFacilitiesRepository invalidates the room when its links change
+        return await self.read_through(
+            filter_by,
+            lambda: self._get_one_with_facilities(**filter_by),
+            schema=RoomWithFacilities,
+            tags=[FacilitiesOrm.__tablename__],
+        )
+
+    async def _get_one_with_facilities(self, **filter_by):
         query = select(self.model).options(joinedload(self.model.facilities)).filter_by(**filter_by)
         result = await self.session.execute(query)
         model = result.unique().scalars().one_or_none()
         if model is None:
             return None
         return RoomWithFacilities.model_validate(model, from_attributes=True)
+
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> None:
+        query = select(self.model.id, self.model.hotel_id).filter_by(**filter_by)
+        rooms = (await self.session.execute(query)).all()
+        room_ids = [room_id for room_id, _ in rooms]
+        await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+        if "quantity" in data.model_dump(exclude_unset=exclude_unset):
+            await RoomInventoryRepository(self.session).sync_capacity(room_ids)
+        # The rooms may have moved to another hotel, both hotels need a fresh search_vector
+        query = select(self.model.hotel_id).where(self.model.id.in_(room_ids))
+        new_hotel_ids = (await self.session.execute(query)).scalars().all()
+        hotel_ids = {hotel_id for _, hotel_id in rooms} | set(new_hotel_ids)
+        await self.hotels.refresh_search_vector(list(hotel_ids))
@@ -1,8 +1,36 @@
+from functools import partial
+
+from pydantic import BaseModel
+from sqlalchemy import select
+
 from src.repositories.base import BaseRepository
 from src.models.users import UsersOrm
 from src.repositories.mappers.mappers import UserMapper
+from src.schemas.users import UserProfile
+from src.init import user_profile_cache
 
 
 class UsersRepository(BaseRepository):
     model = UsersOrm
     mapper = UserMapper
+
+    async def get_profile(self, user_id: int) -> UserProfile | None:
+        """Profile of the user, read through user_profile_cache."""
+
+        async def load():
+            user = await self.get_one_or_none(id=user_id)
+            return None if user is None else UserProfile.model_validate(user.model_dump())
+
+        return await user_profile_cache.get_or_load(user_id, load)
+
+    async def _invalidate_profiles(self, **filter_by) -> None:
+        result = await self.session.execute(select(self.model.id).filter_by(**filter_by))
+        self.after_commit(partial(user_profile_cache.invalidate, result.scalars().all()))
+
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> None:
+        await self._invalidate_profiles(**filter_by)
+        await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+
+    async def delete(self, **filter_by) -> None:
+        await self._invalidate_profiles(**filter_by)
+        await super().delete(**filter_by)
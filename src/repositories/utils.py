@@ -1,47 +1,154 @@
-from src.models.rooms import RoomsOrm
 from src.models.bookings import BookingsOrm
-from sqlalchemy import select, func
-from datetime import date
+from src.models.hotels import HotelsOrm
+from src.models.rooms import RoomsOrm
+from src.models.room_inventory import RoomInventoryDailyOrm
+from src.exeptions import InvalidCursorException
+from src.utils.pagination import decode_cursor
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Select, select, exists, func, literal, literal_column, true, tuple_
+from sqlalchemy.dialects.postgresql import DATERANGE, TSVECTOR
+from datetime import date, timedelta
+
+
+def availability_tags(date_from: date, date_to: date, hotel_id: int | None = None) -> list[str]:
+    """
+    Cache tags of the availability of the nights [date_from, date_to): one per month,
+    of all hotels, or with hotel_id of that hotel only. Booking writes invalidate
+    both for the months of their stay.
+    """
+    prefix = "availability" if hotel_id is None else f"availability:{hotel_id}"
+    tags = []
+    month = date_from.replace(day=1)
+    while month < date_to:
+        tags.append(f"{prefix}:{month:%Y-%m}")
+        month = (month + timedelta(days=32)).replace(day=1)
+    return tags
+
+
+def stay_overlaps(date_from: date, date_to: date):
+    """Bookings with at least one night in [date_from, date_to), served by the GiST index."""
+    window = func.daterange(date_from, date_to, literal("[)"), type_=DATERANGE)
+    return BookingsOrm.stay.overlaps(window)
+
+
+def sold_out_nights(date_from: date, date_to: date, room_id):
+    """Sold-out nights of `room_id` (a value or a correlated column) in [date_from, date_to)."""
+    return select(RoomInventoryDailyOrm.night).where(
+        RoomInventoryDailyOrm.room_id == room_id,
+        RoomInventoryDailyOrm.night >= date_from,
+        RoomInventoryDailyOrm.night < date_to,
+        RoomInventoryDailyOrm.booked >= RoomInventoryDailyOrm.capacity,
+    )
 
 
 def room_ids_for_booking(date_from: date, date_to: date, hotel_id: int | None = None):
-    rooms_count = (
-        select(BookingsOrm.room_id, func.count("*").label("rooms_booked"))
-        .where(
-            BookingsOrm.check_in_date <= date_to,
-            BookingsOrm.check_out_date >= date_from,
-        )
-        .group_by(BookingsOrm.room_id)
-        .cte("rooms_count")
+    """
+    with sold_out as (
+        select night from room_inventory_daily
+        where room_id = rooms.id
+        and night >= :date_from and night < :date_to
+        and booked >= capacity
     )
+    select id from rooms where not exists (sold_out) and hotel_id = :hotel_id
 
-    # CTE 2: available_rooms - calculate available room quantity
-    rooms_available = (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label(
-        "rooms_available"
+    Every night of the stay is checked against the per-night counters kept in
+    room_inventory_daily, so each room costs one range scan of its primary key.
+    """
+    rooms_ids_to_get = select(RoomsOrm.id).where(
+        ~exists(sold_out_nights(date_from, date_to, RoomsOrm.id))
     )
-    available_rooms = (
-        select(RoomsOrm.id.label("room_id"), rooms_available)
+    if hotel_id:
+        rooms_ids_to_get = rooms_ids_to_get.where(RoomsOrm.hotel_id == hotel_id)
+    return rooms_ids_to_get
+
+
+def hotel_availability_summary(
+    date_from: date, date_to: date, facility_ids: list[int] | None = None
+):
+    """
+    select sum(units_left) as rooms_left,
+           min(price) filter (where units_left > 0) as min_price
+    from rooms, lateral (
+        select max(booked) as booked from room_inventory_daily
+        where room_id = rooms.id and night >= :date_from and night < :date_to
+    ) as peak
+    where rooms.hotel_id = hotels.id
+
+    A lateral subquery correlated to hotels: joined to a page of hotels it only
+    aggregates the rooms of those hotels. units_left is the room quantity minus
+    the busiest night of the stay. With facility_ids only the rooms having all of
+    them are counted.
+    """
+    peak = (
+        select(func.max(RoomInventoryDailyOrm.booked).label("booked"))
+        .where(
+            RoomInventoryDailyOrm.room_id == RoomsOrm.id,
+            RoomInventoryDailyOrm.night >= date_from,
+            RoomInventoryDailyOrm.night < date_to,
+        )
+        .lateral("peak")
+    )
+    units_left = func.greatest(RoomsOrm.quantity - func.coalesce(peak.c.booked, 0), 0)
+    summary = (
+        select(
+            func.coalesce(func.sum(units_left), 0).label("rooms_left"),
+            func.min(RoomsOrm.price).filter(units_left > 0).label("min_price"),
+        )
         .select_from(RoomsOrm)
-        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
-        .cte("available_rooms")
+        .join(peak, true())
+        .where(RoomsOrm.hotel_id == HotelsOrm.id)
     )
+    if facility_ids:
+        summary = summary.where(RoomsOrm.facility_ids.contains(facility_ids))
+    return summary.lateral("availability")
 
-    # Final query: select rooms with rooms_available > 0 and add filter by hotel_id
-    rooms_ids_for_hotel = select(RoomsOrm.id)
-    if hotel_id:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.where(RoomsOrm.hotel_id == hotel_id)
-    # rooms_ids_for_hotel = rooms_ids_for_hotel.subquery()
 
-    rooms_ids_to_get = (
-        select(available_rooms.c.room_id)
-        .select_from(available_rooms)
-        .where(
-            available_rooms.c.rooms_available > 0,
-            available_rooms.c.room_id.in_(rooms_ids_for_hotel),
+SEARCH_CONFIG = "english"
+
+
+def weighted_tsvector(document, weight: str):
+    """to_tsvector of a possibly NULL document, every lexeme labelled with weight A-D."""
+    vector = func.to_tsvector(SEARCH_CONFIG, func.coalesce(document, ""))
+    return func.setweight(vector, literal_column(f"'{weight}'"), type_=TSVECTOR)
+
+
+def hotel_own_tsvector():
+    """Search document of the hotel row itself: title (A) and location (B)."""
+    return weighted_tsvector(HotelsOrm.title, "A").op("||", return_type=TSVECTOR)(
+        weighted_tsvector(HotelsOrm.location, "B")
+    )
+
+
+def hotel_search_tsvector():
+    """
+    Full search document of a hotel: its own text plus the titles (C) and
+    descriptions (D) of all its rooms, with the same weights as rooms.search_vector.
+    """
+    rooms_text = (
+        select(
+            weighted_tsvector(func.string_agg(RoomsOrm.title, " "), "C").op(
+                "||", return_type=TSVECTOR
+            )(weighted_tsvector(func.string_agg(RoomsOrm.description, " "), "D"))
         )
+        .where(RoomsOrm.hotel_id == HotelsOrm.id)
+        .scalar_subquery()
     )
+    return hotel_own_tsvector().op("||", return_type=TSVECTOR)(rooms_text)
 
-    # print(
-    #     rooms_ids_to_get.compile(bind=engine, compile_kwargs={"literal_binds": True})
-    # )
-    return rooms_ids_to_get
+
+def seek_after(query: Select, sort_column, id_column, cursor: str | None) -> Select:
+    """
+    Order by (sort_column, id_column) and, given the cursor of the previous page,
+    keep only the rows after it. The row comparison
+    (sort_column, id) > (:sort_value, :id) is a range scan of a btree on both
+    columns, so deep pages cost the same as the first one.
+    """
+    query = query.order_by(sort_column, id_column)
+    if cursor is None:
+        return query
+    sort_value, row_id = decode_cursor(cursor)
+    try:
+        sort_value = TypeAdapter(sort_column.type.python_type).validate_python(sort_value)
+    except ValidationError:
+        raise InvalidCursorException
+    return query.where(tuple_(sort_column, id_column) > tuple_(sort_value, row_id))
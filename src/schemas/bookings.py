@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import date
+from typing import Literal
 
 
 class BookingAddRequest(BaseModel):
@@ -27,3 +28,20 @@ class BookingBulkRequest(BaseModel):
     check_in_date: date
     check_out_date: date
     price: int
+
+
+BulkRejectionReason = Literal[
+    "invalid_date_range",
+    "user_not_found",
+    "hotel_not_found",
+    "room_not_found",
+    "room_not_in_hotel",
+    "sold_out",
+]
+
+
+class BookingBulkRejection(BaseModel):
+    """A row of a bulk booking request that was not inserted"""
+
+    index: int = Field(..., description="Position of the row in the request")
+    reason: BulkRejectionReason
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class BulkUpsertResult(BaseModel):
+    inserted: int = Field(0, description="Rows that did not exist yet")
+    updated: int = Field(0, description="Existing rows that were changed")
+    unchanged: int = Field(0, description="Existing rows that were left as they were")
+    ids: list[int] = Field(default_factory=list, exclude=True)
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from src.schemas.rooms import Room
 
 
 class HotelAdd(BaseModel):
@@ -14,3 +15,13 @@ class Hotel(HotelAdd):
 class HotelPatch(BaseModel):
     title: str | None = Field(None, description="Title of the hotel")
     location: str | None = Field(None, description="Location of the hotel")
+
+
+class HotelSearchResult(Hotel):
+    rank: float = Field(..., description="Full-text search rank, higher is better")
+    rooms: list[Room] = Field([], description="Rooms of the hotel matching the query")
+
+
+class HotelWithAvailability(Hotel):
+    rooms_left: int = Field(..., description="Room units bookable for the whole stay")
+    min_price: int | None = Field(None, description="Lowest price of an available room")
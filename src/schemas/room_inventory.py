@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from datetime import date
+
+
+class RoomInventoryDaily(BaseModel):
+    room_id: int = Field(..., description="ID of the room")
+    night: date = Field(..., description="Night the counters refer to")
+    booked: int = Field(..., description="Number of units booked for the night")
+    capacity: int = Field(..., description="Number of units the room has")
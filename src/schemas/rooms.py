@@ -50,3 +50,4 @@ class RoomAddBulk(BaseModel):
     description: str | None = Field(None, description="Description of the room")
     price: int = Field(..., description="Price of the room")
     quantity: int = Field(..., description="Quantity of the room")
+    facilities: list[int] = Field([], description="List of facility IDs")
@@ -18,6 +18,12 @@ class User(UserAdd):
     hashed_password: str = Field(exclude=True)
 
 
+class UserProfile(BaseModel):
+    id: int = Field(..., description="ID of the user")
+    username: str = Field(..., description="Username of the user")
+    email: EmailStr = Field(..., description="Email of the user")
+
+
 class UserLogin(BaseModel):
     email: EmailStr = Field(..., description="Email of the user")
     password: str = Field(..., description="Password of the user raw")
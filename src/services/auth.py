@@ -1,40 +1,58 @@
-from pwdlib import PasswordHash
 from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 import jwt
 
 from src.config import settings
 from src.services.base import BaseService
 from src.exeptions import TokenExpiredException, InvalidTokenException
+from src.utils.password_hasher import hash_password, verify_password
+from src.utils.token_cache import VerifiedTokenCache
 
 
 class AuthService(BaseService):
     def __init__(self):
-        self.password_hash = PasswordHash.recommended()
+        self.token_cache = VerifiedTokenCache(
+            maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+        )
 
     def create_access_token(self, data: dict) -> str:
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
         )
-        to_encode.update({"exp": expire})
+        # jti identifies the token in the revocation list
+        to_encode.update({"exp": expire, "jti": uuid4().hex})
         encoded_jwt = jwt.encode(
             to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
         )
         return encoded_jwt
 
     def decode_access_token(self, token: str) -> dict:
+        """
+        Payload of a valid token. Tokens verified before are served from token_cache
+        without checking the signature again; the payload must not be modified.
+        """
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(
                 token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
             )
-            return payload
         except jwt.ExpiredSignatureError:
             raise TokenExpiredException
         except jwt.InvalidTokenError:
             raise InvalidTokenException
+        self.token_cache.put(token, payload)
+        return payload
 
+    # Blocking: request handlers go through the src.init.password_hasher pool instead
     def hash_password(self, password: str) -> str:
-        return self.password_hash.hash(password)
+        return hash_password(password)
 
     def verify_password(self, password: str, hashed_password: str) -> bool:
-        return self.password_hash.verify(password, hashed_password)
+        return verify_password(password, hashed_password)
+
+
+# Shared by the request handlers, so the token cache lives as long as the process
+auth_service = AuthService()
@@ -1,8 +1,35 @@
+from functools import wraps
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.exeptions import DatabaseException
 from src.utils.db_manager import DBManager
 
 
+def transactional(method):
+    """
+    Run the service method as one unit of work through DBManager.run_in_transaction:
+    it is committed when it returns, replayed on deadlocks and serialization failures,
+    and rolled back otherwise. Database errors that remain are raised as
+    DatabaseException. The method itself must not commit.
+    """
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await self.db.run_in_transaction(
+                lambda: method(self, *args, **kwargs), isolation_level=self.isolation_level
+            )
+        except SQLAlchemyError:
+            raise DatabaseException
+
+    return wrapper
+
+
 class BaseService:
-    db: DBManager 
+    db: DBManager
+    # Isolation level of the @transactional methods, None for the database default
+    isolation_level: str | None = None
 
     def __init__(self, db: DBManager) -> None:
-        self.db = db
\ No newline at end of file
+        self.db = db
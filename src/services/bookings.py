@@ -1,67 +1,69 @@
+import time
+
 from sqlalchemy.exc import SQLAlchemyError
 from loguru import logger
 
 from src.exeptions import (
-    ObjectNotFoundException,
-    AllRoomsAreBookedException,
-    ObjectAlreadyExistsException,
+    check_date_range,
     DatabaseException,
 )
-from src.services.base import BaseService
-from src.schemas.bookings import BookingAddRequest, BookingAdd, BookingBulkRequest
+from src.config import settings
+from src.services.base import BaseService, transactional
+from src.schemas.bookings import BookingAddRequest, BookingBulkRequest
 
 
 class BookingService(BaseService):
-    async def get_all_bookings(self):
+    isolation_level = settings.BOOKING_ISOLATION_LEVEL
+
+    async def get_all_bookings(
+        self, per_page: int | None = None, offset: int = 0, cursor: str | None = None
+    ):
         try:
-            return await self.db.bookings.get_all()
+            return await self.db.bookings.get_page(limit=per_page, offset=offset, cursor=cursor)
         except SQLAlchemyError:
             raise DatabaseException
 
-    async def get_my_bookings(self, user_id: int):
+    async def get_my_bookings(
+        self,
+        user_id: int,
+        per_page: int | None = None,
+        offset: int = 0,
+        cursor: str | None = None,
+    ):
         try:
-            return await self.db.bookings.get_filtered(user_id=user_id)
+            return await self.db.bookings.get_page(
+                limit=per_page, offset=offset, cursor=cursor, user_id=user_id
+            )
         except SQLAlchemyError:
             raise DatabaseException
 
+    @transactional
     async def create_booking(self, booking_data: BookingAddRequest, user_id: int):
-        try:
-            booking = await self.db.bookings.create_booking(booking_data, user_id, self.db)
-            await self.db.commit()
-        except (ObjectNotFoundException, AllRoomsAreBookedException):
-            raise
-        except SQLAlchemyError:
-            await self.db.rollback()
-            raise DatabaseException
+        # A sold-out room raises after the free nights were taken, @transactional
+        # rolls them back
+        check_date_range(booking_data.check_in_date, booking_data.check_out_date)
+        booking = await self.db.bookings.create_booking(booking_data, user_id)
         logger.info("Booking created: {}", booking)
         return booking
 
+    @transactional
     async def create_bookings_bulk(self, bookings_data: list[BookingBulkRequest]):
-        try:
-            valid_user_ids = {u.id for u in await self.db.users.get_all()}
-            valid_hotel_ids = {h.id for h in await self.db.hotels.get_filtered()}
-            valid_room_ids = {r.id for r in await self.db.rooms.get_all()}
-
-            valid = [
-                BookingAdd(**b.model_dump())
-                for b in bookings_data
-                if b.user_id in valid_user_ids
-                and b.hotel_id in valid_hotel_ids
-                and b.room_id in valid_room_ids
-            ]
-
-            if valid:
-                await self.db.bookings.add_bulk(valid)
-                await self.db.commit()
-        except ObjectAlreadyExistsException:
-            raise
-        except SQLAlchemyError:
-            await self.db.rollback()
-            raise DatabaseException
-
-        skipped = len(bookings_data) - len(valid)
-        logger.info("Bulk bookings: inserted={}, skipped={}", len(valid), skipped)
-        return {"inserted": len(valid), "skipped": skipped}
+        started = time.perf_counter()
+        rejected = await self.db.bookings.add_bulk_checked(bookings_data)
+        rows_per_second = round(len(bookings_data) / (time.perf_counter() - started))
+        inserted = len(bookings_data) - len(rejected)
+        logger.info(
+            "Bulk bookings: inserted={}, rejected={}, rows/s={}",
+            inserted,
+            len(rejected),
+            rows_per_second,
+        )
+        return {
+            "inserted": inserted,
+            "skipped": len(rejected),
+            "rejected": rejected,
+            "rows_per_second": rows_per_second,
+        }
 
     async def get_bookings_timeline(self):
         """Get all bookings for timeline visualization."""
@@ -24,3 +24,14 @@ class FacilityService(BaseService):
             raise DatabaseException
         logger.info("Facility created: {}", facility_data.title)
         return facility
+
+    async def create_facilities_bulk(self, facilities_data: list[FacilityAdd]):
+        """Add the facilities whose titles do not exist yet, so re-imports are idempotent."""
+        try:
+            result = await self.db.facilities.upsert_bulk(facilities_data, conflict_cols=["title"])
+            await self.db.commit()
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise DatabaseException
+        logger.info("Bulk facilities: inserted={}, existing={}", result.inserted, result.unchanged)
+        return result
@@ -14,8 +14,6 @@ from src.schemas.hotels import HotelAdd, HotelPatch
 from src.services.images import ImageService
 
 
-
-
 class HotelService(BaseService):
     async def get_all_hotels(
         self,
@@ -26,6 +24,10 @@ class HotelService(BaseService):
         location: str | None,
         per_page: int,
         offset: int,
+        fuzzy: bool = False,
+        cursor: str | None = None,
+        with_summary: bool = False,
+        facility_ids: list[int] | None = None,
     ):
         check_date_range(date_from, date_to)
         try:
@@ -37,11 +39,21 @@ class HotelService(BaseService):
                 location=location,
                 limit=per_page,
                 offset=offset,
+                fuzzy=fuzzy,
+                cursor=cursor,
+                with_summary=with_summary,
+                facility_ids=facility_ids,
             )
         except SQLAlchemyError:
             raise DatabaseException
         return hotels
 
+    async def search_hotels(self, text: str, per_page: int, offset: int):
+        try:
+            hotels = await self.db.hotels.search(text=text, limit=per_page, offset=offset)
+        except SQLAlchemyError:
+            raise DatabaseException
+        return hotels
 
     async def get_hotel_by_id(self, hotel_id: int):
         hotel = await self.db.hotels.get_one(id=hotel_id)
@@ -96,4 +108,4 @@ class HotelService(BaseService):
     @staticmethod
     def upload_hotel_image(hotel_id: int, file):
         ImageService.save_and_process_hotel_image(hotel_id, file)
-        logger.info("Image uploaded for hotel_id={}, filename={}", hotel_id, file.filename)
\ No newline at end of file
+        logger.info("Image uploaded for hotel_id={}, filename={}", hotel_id, file.filename)
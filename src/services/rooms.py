@@ -1,3 +1,4 @@
+import time
 from datetime import date
 
 from sqlalchemy.exc import SQLAlchemyError
@@ -6,6 +7,8 @@ from loguru import logger
 from src.exeptions import (
     check_date_range,
     ObjectNotFoundException,
+    HotelNotFoundException,
+    FacilityNotFoundException,
     ObjectAlreadyExistsException,
     DatabaseException,
 )
@@ -19,11 +22,20 @@ class RoomService(BaseService):
         room = await self.db.rooms.get_one(id=room_id, hotel_id=hotel_id)
         return room
 
-    async def get_all_rooms(self, hotel_id: int, date_from: date, date_to: date):
+    async def get_all_rooms(
+        self,
+        hotel_id: int,
+        date_from: date,
+        date_to: date,
+        facility_ids: list[int] | None = None,
+    ):
         check_date_range(date_from, date_to)
         try:
             rooms = await self.db.rooms.get_filtered_by_time(
-                hotel_id=hotel_id, date_from=date_from, date_to=date_to
+                hotel_id=hotel_id,
+                date_from=date_from,
+                date_to=date_to,
+                facility_ids=facility_ids,
             )
         except SQLAlchemyError:
             raise DatabaseException
@@ -55,7 +67,9 @@ class RoomService(BaseService):
         await self.db.rooms.get_one(id=room_id)
 
         try:
-            await self.db.rooms.edit(RoomAdd(**room_data.model_dump(), hotel_id=hotel_id), id=room_id)
+            await self.db.rooms.edit(
+                RoomAdd(**room_data.model_dump(), hotel_id=hotel_id), id=room_id
+            )
             await self.db.room_facilities.set_room_facilities(room_id, room_data.facilities)
             await self.db.commit()
         except SQLAlchemyError:
@@ -92,19 +106,32 @@ class RoomService(BaseService):
         logger.info("Room deleted: id={}", room_id)
 
     async def create_rooms_bulk(self, rooms_data: list[RoomAddBulk]):
-        # Verify all hotel_ids exist
-        hotel_ids = set(room.hotel_id for room in rooms_data)
-        for hotel_id in hotel_ids:
-            await self.db.hotels.get_one(id=hotel_id)
-
+        started = time.perf_counter()
         try:
-            rooms_to_add = [RoomAdd(**room.model_dump()) for room in rooms_data]
-            await self.db.rooms.add_bulk(rooms_to_add)
+            missing_hotels = await self.db.hotels.missing_ids({r.hotel_id for r in rooms_data})
+            if missing_hotels:
+                logger.warning("Bulk rooms: hotels not found: {}", missing_hotels)
+                raise HotelNotFoundException
+            facility_ids = {f for room in rooms_data for f in room.facilities}
+            missing_facilities = await self.db.facilities.missing_ids(facility_ids)
+            if missing_facilities:
+                logger.warning("Bulk rooms: facilities not found: {}", missing_facilities)
+                raise FacilityNotFoundException
+            # COPY is the fastest way in but cannot return the ids the links need
+            plain = [RoomAdd(**room.model_dump()) for room in rooms_data if not room.facilities]
+            created = await self.db.rooms.copy_bulk(plain)
+            with_facilities = [room for room in rooms_data if room.facilities]
+            linked, links = await self.db.rooms.add_bulk_with_facilities(with_facilities)
+            created += linked
             await self.db.commit()
-        except ObjectAlreadyExistsException:
-            raise
         except SQLAlchemyError:
             await self.db.rollback()
             raise DatabaseException
-        logger.info("Bulk rooms created: count={}", len(rooms_to_add))
-        return len(rooms_to_add)
+        rows_per_second = round(created / (time.perf_counter() - started))
+        logger.info(
+            "Bulk rooms created: count={}, facilities={}, rows/s={}",
+            created,
+            links,
+            rows_per_second,
+        )
+        return created, rows_per_second
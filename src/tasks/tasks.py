@@ -9,6 +9,7 @@ from src.tasks.celery_app import celery_instance
 from src.models.hotels import HotelsOrm
 from src.utils.db_manager import DBManager
 from src.database import new_session_null_pool
+from src.init import redis_manager, repository_cache
 
 
 def run_async(coro):
@@ -48,6 +49,12 @@ def process_hotel_image(hotel_id: int, temp_file_path: str):
                 )
                 await session.execute(stmt)
                 await session.commit()
+            # Hotel reads are cached by the API workers
+            await redis_manager.connect()
+            try:
+                await repository_cache.invalidate(["hotels", f"hotels:{hotel_id}"])
+            finally:
+                await redis_manager.close()
 
         run_async(update_db())
         logger.info("Image processed for hotel_id={}: original={}, thumb={}", hotel_id, original_name, thumb_name)
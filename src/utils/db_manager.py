@@ -1,12 +1,47 @@
 import asyncio
-from sqlalchemy.exc import OperationalError
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.repositories.base import AFTER_COMMIT, CACHE_TAGS
 from src.repositories.hotels import HotelsRepository
 from src.repositories.rooms import RoomsRepository
 from src.repositories.users import UsersRepository
 from src.repositories.bookings import BookingsRepository
 from src.repositories.facilities import FacilitiesRepository, RoomFacilitiesRepository
+from src.repositories.room_inventory import RoomInventoryRepository
+
+
+T = TypeVar("T")
+
+# SQLSTATEs after which the whole transaction can simply be run again
+DEADLOCK_DETECTED = "40P01"
+SERIALIZATION_FAILURE = "40001"
+
+TRANSACTION_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.02
+RETRY_MAX_DELAY = 1.0
+
+
+@dataclass
+class CommitStats:
+    """Outcomes of DBManager commits and transactions, across all sessions of the process."""
+
+    commits: int = 0
+    retries: int = 0
+    deadlocks: int = 0
+    serialization_failures: int = 0
+    failures: int = 0
+
+
+commit_stats = CommitStats()
+
+
+def sqlstate(error: DBAPIError) -> str | None:
+    return getattr(error.orig, "sqlstate", None)
 
 
 class DBManager:
@@ -21,28 +56,64 @@ class DBManager:
         self.bookings = BookingsRepository(self.session)
         self.facilities = FacilitiesRepository(self.session)
         self.room_facilities = RoomFacilitiesRepository(self.session)
+        self.room_inventory = RoomInventoryRepository(self.session)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if exc_type:  # Rollback только если была ошибка
-            await self.session.rollback()
+            await self.rollback()
         await self.session.close()
 
     async def commit(self):
+        await self.session.commit()
+        commit_stats.commits += 1
+        for callback in self.session.info.pop(AFTER_COMMIT, []):
+            await callback()
+
+    async def run_in_transaction(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        isolation_level: str | None = None,
+    ) -> T:
         """
-        session commit with deadlock exception handling
+        Run operation() and commit as one transaction. After a deadlock or a
+        serialization failure the transaction is rolled back and operation() is run
+        again from the start, after a random delay that grows with every attempt.
+        Any other error rolls back and is raised.
+
+        operation must not commit itself, and must do all of its reads through this
+        DBManager, so that every attempt works on a fresh snapshot.
         """
-        for attempt in range(3):
+        for attempt in range(1, TRANSACTION_ATTEMPTS + 1):
             try:
-                await self.session.commit()
-                return
-            except OperationalError as e:
-                if "deadlock" in str(e).lower():
-                    await self.session.rollback()
-                    if attempt < 2:
-                        await asyncio.sleep(0.1 * (attempt + 1))
-                        continue
+                if isolation_level is not None:
+                    await self.session.connection(
+                        execution_options={"isolation_level": isolation_level}
+                    )
+                result = await operation()
+                await self.commit()
+                return result
+            except DBAPIError as e:
+                await self.rollback()
+                if sqlstate(e) == DEADLOCK_DETECTED:
+                    commit_stats.deadlocks += 1
+                elif sqlstate(e) == SERIALIZATION_FAILURE:
+                    commit_stats.serialization_failures += 1
+                else:
+                    commit_stats.failures += 1
+                    raise
+                if attempt == TRANSACTION_ATTEMPTS:
+                    commit_stats.failures += 1
+                    raise
+                commit_stats.retries += 1
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+                logger.warning("Transaction retry {} after SQLSTATE {}", attempt, sqlstate(e))
+                await asyncio.sleep(random.uniform(0, delay))
+            except BaseException:
+                await self.rollback()
                 raise
 
     async def rollback(self):
+        self.session.info.pop(AFTER_COMMIT, None)
+        self.session.info.pop(CACHE_TAGS, None)
         await self.session.rollback()
@@ -0,0 +1,21 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any
+
+from src.exeptions import InvalidCursorException
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Opaque cursor pointing at the (sort_key, id) of the last row of a page."""
+    key = json.dumps([sort_value, row_id], default=str, separators=(",", ":"))
+    return urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[Any, int]:
+    try:
+        sort_value, row_id = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursorException
+    if not isinstance(row_id, int):
+        raise InvalidCursorException
+    return sort_value, row_id
@@ -0,0 +1,72 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pwdlib import PasswordHash
+
+# One hasher per worker process, created on first use
+_password_hash: PasswordHash | None = None
+
+
+def _hasher() -> PasswordHash:
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = PasswordHash.recommended()
+    return _password_hash
+
+
+def hash_password(password: str) -> str:
+    return _hasher().hash(password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [_hasher().hash(password) for password in passwords]
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return _hasher().verify(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs argon2 hashing in a process pool, so that a hash (tens of milliseconds of
+    CPU) does not block the event loop. Before start() and after close() the work
+    runs inline, which is what scripts and tests without the app lifespan get.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool: ProcessPoolExecutor | None = None
+
+    async def start(self):
+        # spawn: forking a process that runs an event loop and its threads is unsafe
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Start the workers now rather than on the first login
+        await asyncio.gather(*(self._run(hash_passwords, []) for _ in range(self.workers)))
+
+    async def _run(self, func, *args):
+        if self.pool is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hash the passwords split into one chunk per worker, in input order."""
+        chunk_size = -(-len(passwords) // self.workers) or 1
+        chunks = [passwords[i : i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        hashed = await asyncio.gather(*(self._run(hash_passwords, chunk) for chunk in chunks))
+        return [password for chunk in hashed for password in chunk]
+
+    async def close(self):
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            # Let the hashes in flight finish, without blocking the event loop meanwhile
+            await asyncio.to_thread(pool.shutdown)
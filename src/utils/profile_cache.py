@@ -0,0 +1,88 @@
+from typing import Awaitable, Callable
+
+import msgpack
+from loguru import logger
+from redis.exceptions import RedisError
+
+from src.connectors.redis_connector import RedisManager
+from src.schemas.users import UserProfile
+
+PROFILE_KEY = "user_profile:{}"
+VERSION_KEY = "user_profile_version:{}"
+
+
+class UserProfileCache:
+    """
+    Read-through cache of user profiles in Redis, stored as msgpack.
+
+    A change of the user bumps its version (UsersRepository does it after the
+    commit). Entries are stamped with the version read before the profile was
+    loaded and a read fetches both in one MGET, serving the entry only while the
+    stamp matches: a reader that loaded the profile before a write committed
+    stores it under the old version, so it is never served. `ttl` only lets
+    Redis reclaim entries nobody reads; versions outlive them, so a version that
+    expired and restarted from 0 cannot match an old entry. When Redis is
+    unavailable the profile is read from the database.
+    """
+
+    def __init__(self, redis_manager: RedisManager, ttl: int):
+        self.redis_manager = redis_manager
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+
+    async def get_or_load(
+        self, user_id: int, load: Callable[[], Awaitable[UserProfile | None]]
+    ) -> UserProfile | None:
+        key = PROFILE_KEY.format(user_id)
+        try:
+            cached, version = await self.redis_manager.mget_bytes(
+                [key, VERSION_KEY.format(user_id)]
+            )
+        except RedisError:
+            self.errors += 1
+            logger.warning("Profile cache read failed for user {}", user_id)
+            return await load()
+        stamp = version or b"0"
+        if cached is not None:
+            entry_stamp, _, packed = cached.partition(b"\n")
+            if entry_stamp == stamp:
+                self.hits += 1
+                return UserProfile(**msgpack.unpackb(packed))
+            self.stale += 1
+
+        self.misses += 1
+        profile = await load()
+        if profile is not None:
+            try:
+                await self.redis_manager.set_bytes(
+                    key, stamp + b"\n" + msgpack.packb(profile.model_dump()), expire=self.ttl
+                )
+            except RedisError:
+                self.errors += 1
+                logger.warning("Profile cache fill failed for user {}", user_id)
+        return profile
+
+    async def invalidate(self, user_ids: list[int]) -> None:
+        if not user_ids:
+            return
+        try:
+            async with self.redis_manager.pipeline() as pipe:
+                for user_id in user_ids:
+                    pipe.incr(VERSION_KEY.format(user_id))
+                    pipe.expire(VERSION_KEY.format(user_id), 2 * self.ttl)
+        except RedisError:
+            self.errors += 1
+            logger.exception("Profile cache invalidation failed for users {}", user_ids)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,205 @@
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from src.connectors.redis_connector import RedisManager
+from src.utils.stampede import MISSING, SingleFlight, should_refresh_early
+
+ENTRY_KEY = "repo-cache:entry:{}"
+TAG_KEY = "repo-cache:tag:{}"
+
+# (key, tags, payload) of an entry, as get_or_load() would store it
+CacheEntry = tuple[str, list[str], str]
+
+
+class RepositoryCache:
+    """
+    Read-through cache of repository reads in Redis, invalidated by tag.
+
+    Each entry is stamped with the versions its tags had when it was loaded, and a
+    write bumps the versions of the tags it touched (BaseRepository does it after
+    the commit). A read fetches the entry and the current versions of its tags in
+    one MGET and only uses the entry when the stamps match, so a fill that raced a
+    write is never served and no TTL is needed for freshness; `ttl` only lets
+    Redis reclaim entries nobody reads. Tag versions outlive the entries they
+    stamp, a version that expired and restarted from 0 cannot match an old entry.
+
+    Concurrent misses of the same entry are loaded once through `flight`, and an
+    entry is reloaded ahead of its expiry with should_refresh_early(), using how
+    long its load took, so entries read under load never all expire at once.
+
+    Without a Redis connection (scripts, Celery workers that did not connect) reads
+    go to the database and invalidation is skipped.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        ttl: int,
+        flight: SingleFlight | None = None,
+        beta: float = 1.0,
+    ):
+        self.redis_manager = redis_manager
+        self.ttl = ttl
+        self.flight = flight or SingleFlight()
+        self.beta = beta
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.early_refreshes = 0
+        self.errors = 0
+
+    async def get_or_load(
+        self,
+        key: str,
+        tags: Iterable[str],
+        load: Callable[[], Awaitable[Any]],
+        dump: Callable[[Any], str],
+        parse: Callable[[str], Any],
+        ttl: int | None = None,
+        related: Callable[[Any], list[CacheEntry]] | None = None,
+    ) -> Any:
+        """
+        `ttl` shortens the expiry of this entry, at most the cache's own ttl.
+        `related` lists the entries of other reads that a loaded value contains
+        (the rows of a page, say), they are stored together with it.
+        """
+        if self.redis_manager.redis is None:
+            return await load()
+        tags = list(tags)
+        entry_key = ENTRY_KEY.format(key)
+        try:
+            entry, stamp = await self._read(entry_key, tags)
+        except RedisError:
+            self.errors += 1
+            logger.warning("Repository cache read failed for {}", key)
+            return await load()
+
+        flight_key = f"{key}@{stamp}"
+        if entry is not None:
+            # "stamp expires_at load_seconds\npayload", entries filled before early
+            # refresh have the stamp alone
+            header, _, payload = entry.partition("\n")
+            entry_stamp, *timing = header.split(" ")
+            if entry_stamp == stamp:
+                self.hits += 1
+                if not (
+                    timing
+                    and should_refresh_early(
+                        float(timing[1]), float(timing[0]) - time.time(), self.beta
+                    )
+                    and self.flight.lead(flight_key)
+                ):
+                    return parse(payload)
+                self.early_refreshes += 1
+                return await self._fill(
+                    entry_key, tags, stamp, flight_key, load, dump, ttl, related
+                )
+            self.stale += 1
+        self.misses += 1
+
+        async def recheck() -> str | None:
+            entry, current = await self._read(entry_key, tags)
+            if entry is None:
+                return None
+            header, _, payload = entry.partition("\n")
+            return payload if current == stamp and header.split(" ")[0] == stamp else None
+
+        payload = await self.flight.join(flight_key, recheck)
+        if payload is not MISSING:
+            # Loaded by a concurrent request, parsed anew so that no two share objects
+            return None if payload is None else parse(payload)
+        return await self._fill(entry_key, tags, stamp, flight_key, load, dump, ttl, related)
+
+    async def _read(self, entry_key: str, tags: list[str]) -> tuple[str | None, str]:
+        entry, *versions = await self.redis_manager.mget(
+            [entry_key, *(TAG_KEY.format(t) for t in tags)]
+        )
+        return entry, ",".join(version or "0" for version in versions)
+
+    async def _fill(
+        self,
+        entry_key: str,
+        tags: list[str],
+        stamp: str,
+        flight_key: str,
+        load: Callable[[], Awaitable[Any]],
+        dump: Callable[[Any], str],
+        ttl: int | None,
+        related: Callable[[Any], list[CacheEntry]] | None,
+    ) -> Any:
+        """load() as the leader of `flight_key` and store the result."""
+        payload = MISSING
+        started = time.monotonic()
+        try:
+            value = await load()
+            if value is None:
+                # Not found: not stored, a row added later has no tag version to bump
+                payload = None
+                return value
+            payload = dump(value)
+            ttl = min(ttl or self.ttl, self.ttl)
+            timing = f"{time.time() + ttl:.3f} {time.monotonic() - started:.6f}"
+            entries = {entry_key: f"{stamp} {timing}\n{payload}"}
+            try:
+                if related is not None:
+                    entries |= await self._stamp_related(related(value), tags, stamp, timing)
+                await self.redis_manager.mset(entries, expire=ttl)
+            except RedisError:
+                self.errors += 1
+                logger.warning("Repository cache fill failed for {}", entry_key)
+            return value
+        finally:
+            await self.flight.done(flight_key, payload)
+
+    async def _stamp_related(
+        self, related: list[CacheEntry], tags: list[str], stamp: str, timing: str
+    ) -> dict[str, str]:
+        """
+        Related entries are stamped with the versions their tags have now, after the
+        load. That is only safe while the tags of the loaded entry still have the
+        versions read before it (`stamp`), a write in between may have changed the
+        rows after they were read: then they are left out.
+        """
+        versions = await self.redis_manager.mget(
+            [
+                TAG_KEY.format(t)
+                for t in [*tags, *(t for _, entry_tags, _ in related for t in entry_tags)]
+            ]
+        )
+        versions = [version or "0" for version in versions]
+        if ",".join(versions[: len(tags)]) != stamp:
+            return {}
+        entries, position = {}, len(tags)
+        for key, entry_tags, payload in related:
+            entry_stamp = ",".join(versions[position : position + len(entry_tags)])
+            entries[ENTRY_KEY.format(key)] = f"{entry_stamp} {timing}\n{payload}"
+            position += len(entry_tags)
+        return entries
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        if self.redis_manager.redis is None or not tags:
+            return
+        try:
+            async with self.redis_manager.pipeline() as pipe:
+                for tag in tags:
+                    pipe.incr(TAG_KEY.format(tag))
+                    pipe.expire(TAG_KEY.format(tag), 2 * self.ttl)
+        except RedisError:
+            self.errors += 1
+            logger.exception("Repository cache invalidation failed for tags {}", tags)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "early_refreshes": self.early_refreshes,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "single_flight": self.flight.stats(),
+        }
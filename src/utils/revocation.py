@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from loguru import logger
+
+from src.connectors.redis_connector import RedisManager
+from src.utils.bloom import BloomFilter
+
+REVOKED_KEY = "revoked_token:{}"
+# jti -> exp of every revoked token, what the workers rebuild their filters from
+REVOKED_INDEX = "revoked_tokens"
+
+
+class TokenRevocationList:
+    """
+    Revoked tokens, by jti. Redis is the source of truth: one key per token that
+    expires together with the token, plus a sorted set by exp to list them.
+
+    Each worker answers "not revoked" from a local Bloom filter without a round
+    trip and only asks Redis when the filter says "maybe". The filter is rebuilt
+    from Redis every `sync_interval` seconds, so a token revoked by another worker
+    is rejected here at most that much later; tokens revoked by this worker are
+    rejected at once.
+    """
+
+    def __init__(self, redis_manager: RedisManager, sync_interval: float, capacity: int):
+        self.redis_manager = redis_manager
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.bloom = BloomFilter(capacity)
+        self._recent: set[str] = set()
+        self._sync_task: asyncio.Task | None = None
+        self.checks = 0
+        self.redis_lookups = 0
+        self.revoked = 0
+        self.last_sync: float | None = None
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        ttl = int(exp - time.time()) + 1
+        if ttl <= 0:
+            return
+        async with self.redis_manager.transaction() as tx:
+            tx.set(REVOKED_KEY.format(jti), 1, ex=ttl)
+            tx.zadd(REVOKED_INDEX, {jti: exp})
+        self.bloom.add(jti)
+        self._recent.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        self.checks += 1
+        if jti not in self.bloom:
+            return False
+        self.redis_lookups += 1
+        try:
+            return bool(await self.redis_manager.redis.exists(REVOKED_KEY.format(jti)))
+        except Exception:
+            # Fail closed: the token may well be revoked
+            logger.exception("Revocation check failed for token {}", jti)
+            return True
+
+    async def sync(self) -> None:
+        """Rebuild the filter from the tokens that are revoked and not expired yet."""
+        redis = self.redis_manager.redis
+        assert redis is not None
+        self._recent = recent = set()
+        now = time.time()
+        await redis.zremrangebyscore(REVOKED_INDEX, "-inf", now)
+        revoked = await redis.zrangebyscore(REVOKED_INDEX, now, "+inf")
+        bloom = BloomFilter.from_items(revoked, capacity=max(self.capacity, 2 * len(revoked)))
+        # Tokens this worker revoked while the filter was being rebuilt
+        for jti in recent:
+            bloom.add(jti)
+        self.bloom = bloom
+        self.revoked = len(revoked)
+        self.last_sync = time.time()
+
+    def stats(self) -> dict:
+        return {
+            "revoked": self.revoked,
+            "checks": self.checks,
+            "redis_lookups": self.redis_lookups,
+            "last_sync": self.last_sync,
+        }
+
+    async def _sync_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Revocation list sync failed")
+
+    async def start(self) -> None:
+        await self.sync()
+        self._sync_task = asyncio.create_task(self._sync_forever())
+
+    async def close(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
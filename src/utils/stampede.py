@@ -0,0 +1,167 @@
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
+
+from src.connectors.redis_connector import RedisManager
+
+LOCK_KEY = "single-flight:{}"
+# Returned by SingleFlight.join when the caller has to load the value itself
+MISSING: Any = object()
+
+
+def should_refresh_early(delta: float, remaining: float, beta: float = 1.0) -> bool:
+    """
+    Probabilistic early expiration (XFetch): recompute a value that took `delta`
+    seconds to compute and expires in `remaining` seconds before it does. The
+    chance grows as the expiry nears and with slower computations, so under load
+    one request refreshes a hot entry ahead of time instead of all of them
+    recomputing it together once it is gone. `beta` > 1 favours earlier refreshes.
+    """
+    if remaining <= 0:
+        return True
+    return delta * beta * -math.log(1.0 - random.random()) >= remaining
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same key in this worker: the first caller
+    (the leader) loads the value and everyone asking for the key meanwhile awaits
+    its result instead of loading it again.
+
+    With `lock`, the leader also takes a Redis lock on the key, and leaders in
+    other workers that find it taken poll `recheck` for the value the lock holder
+    stores rather than loading it too. Followers wait for at most `timeout`
+    seconds (also the lock's expiry) and load the value themselves when the
+    leader failed, was cancelled or is too slow.
+    """
+
+    # Abandoned flights are pruned once there are this many
+    PRUNE_AT = 1024
+
+    def __init__(
+        self,
+        redis_manager: RedisManager | None = None,
+        timeout: float = 5.0,
+        lock: bool = False,
+        poll_interval: float = 0.05,
+    ):
+        self.redis_manager = redis_manager
+        self.timeout = timeout
+        self.lock = lock
+        self.poll_interval = poll_interval
+        self._flights: dict[str, tuple[float, asyncio.Future]] = {}
+        self._locks: dict[str, Lock] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.remote_waits = 0
+
+    def in_flight(self, key: str) -> bool:
+        flight = self._flights.get(key)
+        return flight is not None and flight[0] > time.monotonic()
+
+    def lead(self, key: str) -> bool:
+        """
+        Become the leader for `key` unless a load of it is already in flight in
+        this worker, without waiting. A leader must call done() afterwards.
+        """
+        if self.in_flight(key):
+            return False
+        now = time.monotonic()
+        if len(self._flights) >= self.PRUNE_AT:
+            for stale in [k for k, (deadline, _) in self._flights.items() if deadline <= now]:
+                del self._flights[stale]
+        self._flights[key] = (now + self.timeout, asyncio.get_running_loop().create_future())
+        self.leaders += 1
+        return True
+
+    async def join(
+        self, key: str, recheck: Callable[[], Awaitable[Any | None]] | None = None
+    ) -> Any:
+        """
+        The value of `key` loaded by the leader, or MISSING when the caller became
+        the leader and has to load it and call done(). `recheck` reads the value
+        another worker stored, None while it is not there yet; without it the
+        Redis lock is not used.
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None or flight[0] <= time.monotonic():
+                break
+            self.followers += 1
+            deadline, future = flight
+            finished, _ = await asyncio.wait([future], timeout=deadline - time.monotonic())
+            if finished and not future.cancelled():
+                return future.result()
+            if not finished:
+                # The leader is too slow, load it without waiting for it any longer
+                return MISSING
+            # The leader gave up: the next caller to get here leads instead
+
+        self.lead(key)
+        if not self.lock or recheck is None or self.redis_manager.redis is None:
+            return MISSING
+        lock = self.redis_manager.redis.lock(LOCK_KEY.format(key), timeout=self.timeout)
+        try:
+            if await lock.acquire(blocking=False):
+                self._locks[key] = lock
+                return MISSING
+            self.remote_waits += 1
+            value = await self._wait_for_lock_holder(lock, recheck)
+        except RedisError:
+            logger.warning("Single-flight lock failed for {}", key)
+            return MISSING
+        if value is not MISSING:
+            await self.done(key, value)
+        return value
+
+    async def _wait_for_lock_holder(
+        self, lock: Lock, recheck: Callable[[], Awaitable[Any | None]]
+    ) -> Any:
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            value = await recheck()
+            if value is not None:
+                return value
+            if not await lock.locked():
+                break
+        return MISSING
+
+    async def done(self, key: str, value: Any = MISSING) -> float | None:
+        """
+        End the flight of `key`, handing `value` to its followers; without a value
+        they load it themselves. Returns how long the flight took in seconds, None
+        if there was none.
+        """
+        elapsed = None
+        flight = self._flights.pop(key, None)
+        if flight is not None:
+            deadline, future = flight
+            elapsed = time.monotonic() - (deadline - self.timeout)
+            if not future.done():
+                if value is MISSING:
+                    future.cancel()
+                else:
+                    future.set_result(value)
+        lock = self._locks.pop(key, None)
+        if lock is not None:
+            try:
+                await lock.release()
+            except (LockError, RedisError):
+                # Expired, and maybe taken by another worker since
+                pass
+        return elapsed
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "remote_waits": self.remote_waits,
+        }
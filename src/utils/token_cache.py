@@ -0,0 +1,58 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """
+    Payloads of tokens whose signature was already verified, keyed by the SHA-256 of
+    the token. Holds at most `maxsize` tokens, least recently used evicted first, and
+    forgets each one after `ttl` seconds or at its `exp`, whichever comes first, so an
+    expired token always goes back to jwt.decode and fails there.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, payload: dict) -> None:
+        expires_at = time.time() + self.ttl
+        if "exp" in payload:
+            expires_at = min(expires_at, payload["exp"])
+        key = self._key(token)
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,294 @@
+import asyncio
+import functools
+import hashlib
+import math
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from loguru import logger
+from starlette.requests import Request
+
+from src.connectors.redis_connector import RedisManager
+from src.utils.stampede import MISSING, SingleFlight, should_refresh_early
+
+INVALIDATION_CHANNEL = "cache-invalidation"
+# Keys this request was told to compute, see cache_route()
+_computing: ContextVar[list[str] | None] = ContextVar("computing", default=None)
+RESUBSCRIBE_DELAY = 1.0
+LISTEN_TIMEOUT = 1.0
+
+
+def request_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Request | None = None,
+    args: tuple,
+    kwargs: dict,
+    **_,
+) -> str:
+    """
+    Cache key from the route and its query string. The default key builder hashes
+    the handler arguments, and those include the per-request DBManager, so no two
+    requests ever shared a key.
+    """
+    if request is None:
+        source = f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
+    else:
+        source = f"{request.method}:{request.url.path}:{sorted(request.query_params.multi_items())}"
+    return f"{namespace}:{hashlib.md5(source.encode()).hexdigest()}"
+
+
+class TwoTierCache(Backend):
+    """
+    fastapi-cache backend with an in-process LRU (L1) in front of Redis (L2).
+
+    L1 keeps at most `maxsize` values, each for at most `ttl` seconds and never past
+    its Redis expiry. Every set() and clear() is published on INVALIDATION_CHANNEL
+    and the other workers drop their L1 copies when they receive it, usually within
+    a few milliseconds; `ttl` bounds the staleness if a message is lost. A worker
+    that loses its subscription empties its L1, it may have missed invalidations.
+
+    The cache decorator computes a value itself after get_with_ttl() reports a miss
+    and stores it with set(). Only the first request to miss a key in this worker
+    (with the Redis lock of `flight`, in any worker) gets the miss; the others
+    wait for that set() and are answered with its value, or compute it themselves
+    if it does not come within the flight's timeout. A hit close to its Redis
+    expiry is reported as a miss to one request, chosen by should_refresh_early()
+    from how long this worker took to compute the key, so that it is recomputed
+    before it expires while everyone else is still served the cached value.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        maxsize: int,
+        ttl: float,
+        flight: SingleFlight | None = None,
+        beta: float = 1.0,
+    ):
+        self.redis_manager = redis_manager
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.flight = flight or SingleFlight()
+        self.beta = beta
+        self.worker_id = uuid.uuid4().hex
+        self.l2: RedisBackend | None = None
+        # key -> (L1 expiry, Redis expiry, value), monotonic
+        self._entries: OrderedDict[str, tuple[float, float, bytes]] = OrderedDict()
+        # key -> seconds its last computation in this worker took
+        self._compute_times: OrderedDict[str, float] = OrderedDict()
+        self._listener: asyncio.Task | None = None
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.early_refreshes = 0
+        self.invalidations = 0
+
+    async def start(self) -> None:
+        assert self.redis_manager.redis_bytes is not None
+        # fastapi-cache coders decode bytes themselves
+        self.l2 = RedisBackend(self.redis_manager.redis_bytes)
+        subscribed = asyncio.Event()
+        self._listener = asyncio.create_task(self._listen(subscribed))
+        await subscribed.wait()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        self._entries.clear()
+
+    def _get_local(self, key: str) -> tuple[float, float, bytes] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put_local(self, key: str, value: bytes, expire: float | None) -> None:
+        now = time.monotonic()
+        if expire is None or expire < 0:
+            ttl, expires_at = self.ttl, math.inf
+        else:
+            ttl, expires_at = min(self.ttl, expire), now + expire
+        self._entries[key] = (now + ttl, expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _evict(self, key: str | None = None, namespace: str | None = None) -> None:
+        if key is not None:
+            self._entries.pop(key, None)
+        if namespace is not None:
+            for cached_key in [k for k in self._entries if k.startswith(f"{namespace}:")]:
+                del self._entries[cached_key]
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        entry = self._get_local(key)
+        if entry is not None:
+            self.l1_hits += 1
+            ttl, value = entry[1] - time.monotonic(), entry[2]
+        else:
+            ttl, value = await self._get_remote(key)
+            if value is None:
+                self.misses += 1
+                found = await self.flight.join(key, recheck=lambda: self._get_remote(key, True))
+                if found is not MISSING:
+                    return found
+                # This request computes the value and set() ends the flight
+                self._computes(key)
+                return 0, None
+            self.l2_hits += 1
+            self._put_local(key, value, ttl)
+
+        compute_time = self._compute_times.get(key)
+        if (
+            compute_time is not None
+            and ttl >= 0
+            and should_refresh_early(compute_time, ttl, self.beta)
+            and self.flight.lead(key)
+        ):
+            self.early_refreshes += 1
+            self._computes(key)
+            return 0, None
+        return (max(0, int(ttl)) if ttl != math.inf else -1), value
+
+    @staticmethod
+    def _computes(key: str) -> None:
+        computing = _computing.get()
+        if computing is not None:
+            computing.append(key)
+
+    async def abandon(self, keys: list[str]) -> None:
+        """The values of `keys` will not be set(), let whoever waits compute them."""
+        for key in keys:
+            await self.flight.done(key)
+
+    async def _get_remote(self, key: str, found_only: bool = False):
+        assert self.l2 is not None
+        ttl, value = await self.l2.get_with_ttl(key)
+        if found_only and value is None:
+            return None
+        return ttl, value
+
+    async def get(self, key: str) -> bytes | None:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        assert self.l2 is not None
+        try:
+            await self.l2.set(key, value, expire)
+            self._put_local(key, value, expire)
+        finally:
+            compute_time = await self.flight.done(key, (expire or 0, value))
+            computing = _computing.get()
+            if computing is not None and key in computing:
+                computing.remove(key)
+        if compute_time is not None:
+            self._compute_times[key] = compute_time
+            self._compute_times.move_to_end(key)
+            while len(self._compute_times) > self.maxsize:
+                self._compute_times.popitem(last=False)
+        await self._publish(f"key {key}")
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        assert self.l2 is not None
+        cleared = await self.l2.clear(namespace, key)
+        if namespace:
+            self._evict(namespace=namespace)
+            await self._publish(f"namespace {namespace}")
+        elif key:
+            self._evict(key=key)
+            await self._publish(f"key {key}")
+        return cleared
+
+    async def _publish(self, message: str) -> None:
+        assert self.redis_manager.redis is not None
+        await self.redis_manager.redis.publish(INVALIDATION_CHANNEL, f"{self.worker_id} {message}")
+
+    def _on_message(self, data: str) -> None:
+        worker_id, kind, name = data.split(" ", 2)
+        if worker_id == self.worker_id:
+            return
+        self.invalidations += 1
+        if kind == "key":
+            self._evict(key=name)
+        else:
+            self._evict(namespace=name)
+
+    async def _listen(self, subscribed: asyncio.Event) -> None:
+        while True:
+            try:
+                async with self.redis_manager.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # Whatever was published while unsubscribed is lost
+                    self._entries.clear()
+                    subscribed.set()
+                    while True:
+                        # listen() would fail with the socket timeout on a quiet channel
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=LISTEN_TIMEOUT
+                        )
+                        if message is not None and message["type"] == "message":
+                            self._on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation subscription lost, resubscribing")
+                self._entries.clear()
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    def stats(self) -> dict:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_size": len(self._entries),
+            "l1_maxsize": self.maxsize,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "early_refreshes": self.early_refreshes,
+            "l1_hit_rate": self.l1_hits / lookups if lookups else 0.0,
+            "l2_hit_rate": self.l2_hits / lookups if lookups else 0.0,
+            "invalidations_received": self.invalidations,
+            "single_flight": self.flight.stats(),
+        }
+
+
+def cache_route(expire: int | None = None, namespace: str = ""):
+    """
+    fastapi-cache's @cache that also ends the flights of the keys the request was
+    computing when the route fails. The decorator only calls set() on success,
+    and without it the requests waiting for the value would wait out the flight
+    timeout before computing it themselves.
+    """
+
+    def decorator(func):
+        cached = cache(expire=expire, namespace=namespace)(func)
+
+        @functools.wraps(cached)
+        async def wrapper(*args, **kwargs):
+            computing = _computing.set([])
+            try:
+                return await cached(*args, **kwargs)
+            except BaseException:
+                backend = FastAPICache.get_backend()
+                if isinstance(backend, TwoTierCache):
+                    await backend.abandon(_computing.get())
+                raise
+            finally:
+                _computing.reset(computing)
+
+        return wrapper
+
+    return decorator
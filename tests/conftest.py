@@ -4,14 +4,17 @@ patch("fastapi_cache.decorator.cache", lambda *args, **kwargs: lambda func: func
 
 
 import pytest
+import redis.asyncio as redis
 from httpx import ASGITransport, AsyncClient
 import json
 from pathlib import Path
 from datetime import datetime
+from sqlalchemy import text
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
 
 from src.main import app
+from src.init import password_hasher, redis_manager, token_revocation
 from src.database import Base, engine_null_pool, new_session_null_pool
 from src.models import *
 from src.config import settings
@@ -46,8 +49,13 @@ async def check_test_mode():
 async def setup_database(check_test_mode):
     # 1. Drop and create tables
     async with engine_null_pool.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    # Caches in Redis refer to the rows of the previous run
+    async with redis.from_url(settings.REDIS_URL) as client:
+        await client.flushdb()
 
     # 2. Load mock data from JSON
     users_data = load_mock("users.json")
@@ -119,6 +127,27 @@ async def delete_all_bookings(db):
     await db.commit()
 
 
+@pytest.fixture(scope="session", autouse=True)
+async def password_hashing_pool():
+    """The app lifespan does not run under ASGITransport, start the pool here."""
+    await password_hasher.start()
+    yield
+    await password_hasher.close()
+
+
+@pytest.fixture(autouse=True)
+async def revocation_list():
+    """
+    Logout and authenticated requests go through the Redis revocation list. The
+    Redis connection is bound to the event loop, and every test has its own.
+    """
+    await redis_manager.connect()
+    await token_revocation.start()
+    yield
+    await token_revocation.close()
+    await redis_manager.close()
+
+
 @pytest.fixture(scope="session", autouse=True)
 async def init_cache(setup_database):
     FastAPICache.init(InMemoryBackend(), prefix="test-cache")
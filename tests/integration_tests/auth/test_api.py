@@ -1,3 +1,18 @@
+from httpx import ASGITransport, AsyncClient
+
+from pydantic import BaseModel
+
+from src.init import redis_manager, token_revocation, user_profile_cache
+from src.schemas.users import UserProfile
+from src.main import app
+from src.services.auth import auth_service
+from src.utils.revocation import TokenRevocationList
+
+
+class UserPatch(BaseModel):
+    username: str
+
+
 async def test_auth_flow(ac):
     """End-to-end: register → login → get me → logout → get me (fail)."""
 
@@ -60,3 +75,98 @@ async def test_auth_flow(ac):
     # 7. Get current user after logout — should fail
     response = await ac.get("/auth/me")
     assert response.status_code == 401
+
+
+async def test_register_bulk(ac):
+    users = [
+        {"email": f"bulk{i}@example.com", "password": "password", "username": f"bulk{i}"}
+        for i in range(3)
+    ]
+    response = await ac.post("/auth/register/bulk", json=users)
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+
+    response = await ac.post(
+        "/auth/login", json={"email": "bulk1@example.com", "password": "password"}
+    )
+    assert response.status_code == 200
+
+    response = await ac.post("/auth/register/bulk", json=users[2:])
+    assert response.status_code == 409
+
+
+async def test_metrics_token_cache_hits(authenticated_ac):
+    assert (await authenticated_ac.get("/auth/me")).status_code == 200
+    before = (await authenticated_ac.get("/metrics")).json()["token_cache"]
+    for _ in range(3):
+        assert (await authenticated_ac.get("/auth/me")).status_code == 200
+    after = (await authenticated_ac.get("/metrics")).json()["token_cache"]
+    assert after["hits"] >= before["hits"] + 3
+
+
+async def test_logout_revokes_token():
+    # Own client: logging out of the shared one would log out authenticated_ac too
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post(
+            "/auth/login", json={"email": "bulk2@example.com", "password": "password"}
+        )
+        assert response.status_code == 200
+        token = response.json()["access_token"]
+        assert (await ac.post("/auth/logout")).status_code == 200
+
+        # A copy of the cookie taken before logout is rejected as well
+        ac.cookies.set("access_token", token)
+        response = await ac.get("/auth/me")
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token revoked"
+
+
+async def test_revocation_reaches_other_workers():
+    token = auth_service.create_access_token({"user_id": 1, "username": "qwerty"})
+    payload = auth_service.decode_access_token(token)
+
+    other_worker = TokenRevocationList(redis_manager, sync_interval=60, capacity=1000)
+    await other_worker.sync()
+    assert not await other_worker.is_revoked(payload["jti"])
+    assert other_worker.redis_lookups == 0  # answered by the filter alone
+
+    await token_revocation.revoke(payload["jti"], payload["exp"])
+    await other_worker.sync()
+    assert await other_worker.is_revoked(payload["jti"])
+
+
+async def test_profile_cache_invalidated_on_edit(db):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post(
+            "/auth/login", json={"email": "bulk0@example.com", "password": "password"}
+        )
+        assert response.status_code == 200
+        assert (await ac.get("/auth/me")).json()["data"]["username"] == "bulk0"
+        hits = user_profile_cache.hits
+        assert (await ac.get("/auth/me")).json()["data"]["username"] == "bulk0"
+        assert user_profile_cache.hits == hits + 1
+
+        await db.users.edit(
+            UserPatch(username="bulk0-renamed"), exclude_unset=True, email="bulk0@example.com"
+        )
+        await db.commit()
+        assert (await ac.get("/auth/me")).json()["data"]["username"] == "bulk0-renamed"
+
+
+async def test_profile_cache_not_refilled_by_stale_read():
+    old = UserProfile(id=424242, username="before", email="stale@example.com")
+    new = UserProfile(id=424242, username="after", email="stale@example.com")
+
+    async def load_old():
+        # The write commits and invalidates while this reader is loading
+        await user_profile_cache.invalidate([old.id])
+        return old
+
+    async def load_new():
+        return new
+
+    assert await user_profile_cache.get_or_load(old.id, load_old) == old
+    assert await user_profile_cache.get_or_load(old.id, load_new) == new
+    hits = user_profile_cache.hits
+    assert await user_profile_cache.get_or_load(old.id, load_old) == new
+    assert user_profile_cache.hits == hits + 1
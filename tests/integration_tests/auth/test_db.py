@@ -0,0 +1,18 @@
+from src.schemas.users import UserAdd
+
+
+async def test_upsert_bulk_chunks(db):
+    """Three columns per user: 12000 users take two statements."""
+    users = [
+        UserAdd(username=f"upsert{i}", email=f"upsert{i}@example.com", hashed_password="x")
+        for i in range(12_000)
+    ]
+    result = await db.users.upsert_bulk(users[:100], conflict_cols=["email"])
+    assert result.inserted == 100
+    users[0] = UserAdd(username="renamed", email="upsert0@example.com", hashed_password="x")
+    result = await db.users.upsert_bulk(
+        users, conflict_cols=["email"], update_cols=["username", "hashed_password"]
+    )
+    assert (result.inserted, result.updated, result.unchanged) == (11_900, 1, 99)
+    assert (await db.users.get_one(email="upsert0@example.com")).username == "renamed"
+    await db.rollback()
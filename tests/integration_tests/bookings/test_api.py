@@ -1,3 +1,5 @@
+from datetime import date
+
 import pytest
 
 
@@ -79,3 +81,83 @@ async def test_create_and_get_my_bookings(
     booked_room_ids = [b["room_id"] for b in my_bookings]
     for room_id in room_ids:
         assert room_id in booked_room_ids
+
+
+async def test_long_stay_counts_peak_night(authenticated_ac):
+    """Room 6 has quantity=2: two short stays never occupy the same night as each other."""
+    stays = [
+        ("2031-05-01", "2031-05-03", 200),
+        ("2031-05-05", "2031-05-07", 200),
+        # overlaps both short stays, but at most 2 units are taken on any night
+        ("2031-05-01", "2031-05-07", 200),
+        # 2031-05-02 already has 2 units taken
+        ("2031-05-02", "2031-05-04", 409),
+        # back-to-back with the first stay: checkout night is free again
+        ("2031-05-03", "2031-05-05", 200),
+    ]
+    for check_in_date, check_out_date, status_code in stays:
+        response = await authenticated_ac.post(
+            "/bookings",
+            json={
+                "room_id": 6,
+                "check_in_date": check_in_date,
+                "check_out_date": check_out_date,
+            },
+        )
+        assert response.status_code == status_code
+
+
+async def test_bookings_cursor_pages(ac):
+    everything = (await ac.get("/bookings/")).json()
+    pages, params = [], {"per_page": 4}
+    while True:
+        response = await ac.get("/bookings/", params=params)
+        assert response.status_code == 200
+        pages.extend(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert [b["id"] for b in pages] == [
+        b["id"] for b in sorted(everything, key=lambda b: (b["check_in_date"], b["id"]))
+    ]
+
+
+async def test_bulk_bookings_rejection_reasons(ac, db):
+    """Room 2 (hotel 1) has quantity=1: only the first of two overlapping stays fits."""
+    stay = {"check_in_date": "2034-01-01", "check_out_date": "2034-01-04", "price": 100}
+    rows = [
+        {"user_id": 1, "hotel_id": 1, "room_id": 2, **stay},
+        {"user_id": 1, "hotel_id": 1, "room_id": 2, **stay, "check_in_date": "2034-01-03"},
+        {"user_id": 999999, "hotel_id": 1, "room_id": 2, **stay},
+        {"user_id": 1, "hotel_id": 999999, "room_id": 2, **stay},
+        {"user_id": 1, "hotel_id": 1, "room_id": 999999, **stay},
+        {"user_id": 1, "hotel_id": 2, "room_id": 2, **stay},
+        {"user_id": 1, "hotel_id": 1, "room_id": 2, **stay, "check_out_date": "2034-01-01"},
+        # the next night is free again
+        {"user_id": 1, "hotel_id": 1, "room_id": 2, **stay, "check_in_date": "2034-01-04",
+         "check_out_date": "2034-01-05"},
+    ]  # fmt: skip
+    response = await ac.post("/bookings/bulk", json=rows)
+    assert response.status_code == 200
+    result = response.json()
+    assert result.pop("rows_per_second") > 0
+    assert result == {
+        "inserted": 2,
+        "skipped": 6,
+        "rejected": [
+            {"index": 1, "reason": "sold_out"},
+            {"index": 2, "reason": "user_not_found"},
+            {"index": 3, "reason": "hotel_not_found"},
+            {"index": 4, "reason": "room_not_found"},
+            {"index": 5, "reason": "room_not_in_hotel"},
+            {"index": 6, "reason": "invalid_date_range"},
+        ],
+    }
+
+    # The stay of the inserted row is now sold out for the bulk path as well
+    response = await ac.post("/bookings/bulk", json=rows[:1])
+    assert response.json()["rejected"] == [{"index": 0, "reason": "sold_out"}]
+
+    for check_in_date in (date(2034, 1, 1), date(2034, 1, 4)):
+        await db.bookings.delete(room_id=2, check_in_date=check_in_date)
+    await db.commit()
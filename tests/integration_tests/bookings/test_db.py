@@ -1,7 +1,12 @@
+import asyncio
 import pytest
 from datetime import date
 
-from src.schemas.bookings import BookingAdd
+from src.database import new_session_null_pool
+from src.init import repository_cache
+from src.exeptions import AllRoomsAreBookedException, ObjectNotFoundException
+from src.schemas.bookings import Booking, BookingAdd, BookingAddRequest
+from src.utils.db_manager import DBManager
 
 
 # ============ FIXTURES ============
@@ -101,3 +106,228 @@ async def test_delete_booking(db, sample_booking):
     # Verify deleted
     deleted = await db.bookings.get_one_or_none(id=booking_id)
     assert deleted is None
+
+
+async def test_booking_updates_room_inventory(db, test_ids):
+    """Adding a booking fills its nights, deleting it releases them."""
+    user_id, room_id, hotel_id = test_ids
+
+    booking = await db.bookings.add(
+        BookingAdd(
+            user_id=user_id,
+            room_id=room_id,
+            hotel_id=hotel_id,
+            check_in_date=date(2030, 1, 10),
+            check_out_date=date(2030, 1, 13),
+            price=1000,
+        )
+    )
+    await db.commit()
+
+    nights = await db.room_inventory.get_filtered(room_id=room_id)
+    booked = {n.night: n.booked for n in nights if n.night.year == 2030}
+    assert booked == {date(2030, 1, 10): 1, date(2030, 1, 11): 1, date(2030, 1, 12): 1}
+
+    await db.bookings.delete(id=booking.id)
+    await db.commit()
+
+    nights = await db.room_inventory.get_filtered(room_id=room_id)
+    assert all(n.booked == 0 for n in nights if n.night.year == 2030)
+
+
+async def test_upsert_bulk_moves_nights(db, sample_booking):
+    """Upserted bookings release their old nights and take the new ones."""
+
+    async def booked():
+        nights = await db.room_inventory.get_filtered(room_id=sample_booking.room_id)
+        return {n.night: n.booked for n in nights}
+
+    before = await booked()
+    moved = Booking(
+        **sample_booking.model_dump(exclude={"check_in_date", "check_out_date"}),
+        check_in_date=date(2031, 3, 1),
+        check_out_date=date(2031, 3, 3),
+    )
+    result = await db.bookings.upsert_bulk(
+        [moved], conflict_cols=["id"], update_cols=["check_in_date", "check_out_date"]
+    )
+    await db.commit()
+    assert (result.updated, result.ids) == (1, [sample_booking.id])
+
+    after = await booked()
+    assert after[date(2031, 3, 1)] == after[date(2031, 3, 2)] == 1
+    assert after[date(2027, 6, 1)] == before[date(2027, 6, 1)] - 1
+
+    await db.bookings.delete(id=sample_booking.id)
+    await db.commit()
+
+
+async def test_rebuild_room_inventory(db):
+    """Rebuilding from the bookings table reproduces the incrementally kept counters."""
+    before = {(n.room_id, n.night): n.booked for n in await db.room_inventory.get_all()}
+
+    await db.room_inventory.rebuild()
+    await db.commit()
+
+    after = {(n.room_id, n.night): n.booked for n in await db.room_inventory.get_all()}
+    assert after == {key: booked for key, booked in before.items() if booked > 0}
+
+
+async def test_get_overlapping_bookings(db, test_ids):
+    """A stay overlaps a window when they share a night; checkout day is not a night."""
+    user_id, room_id, hotel_id = test_ids
+
+    booking = await db.bookings.add(
+        BookingAdd(
+            user_id=user_id,
+            room_id=room_id,
+            hotel_id=hotel_id,
+            check_in_date=date(2032, 3, 10),
+            check_out_date=date(2032, 3, 12),
+            price=1000,
+        )
+    )
+    await db.commit()
+
+    overlapping = await db.bookings.get_overlapping(date(2032, 3, 11), date(2032, 3, 15))
+    assert [b.id for b in overlapping] == [booking.id]
+
+    touching = await db.bookings.get_overlapping(date(2032, 3, 12), date(2032, 3, 15))
+    assert touching == []
+
+
+async def test_rebuild_room_inventory_window(db):
+    """Rebuilding one window leaves the counters outside of it untouched."""
+    before = {(n.room_id, n.night): n.booked for n in await db.room_inventory.get_all()}
+
+    await db.room_inventory.rebuild(date(2026, 2, 1), date(2026, 2, 15))
+    await db.commit()
+
+    after = {(n.room_id, n.night): n.booked for n in await db.room_inventory.get_all()}
+    assert after == {
+        key: booked
+        for key, booked in before.items()
+        if booked > 0 or not date(2026, 2, 1) <= key[1] < date(2026, 2, 15)
+    }
+
+
+async def test_rebuild_room_inventory_from_date(db):
+    """A rebuild with one bound only recomputes the nights on its side of it."""
+    before = {(n.room_id, n.night): n.booked for n in await db.room_inventory.get_all()}
+
+    await db.room_inventory.rebuild(date_from=date(2026, 2, 1))
+    await db.commit()
+
+    after = {(n.room_id, n.night): n.booked for n in await db.room_inventory.get_all()}
+    assert after == {
+        key: booked for key, booked in before.items() if booked > 0 or key[1] < date(2026, 2, 1)
+    }
+
+
+async def test_create_booking_single_statement(db, test_ids):
+    """A sold-out night rejects the whole stay and the rollback releases the free nights."""
+    user_id, _, _ = test_ids
+    # Room 10 (Opera View Suite) has quantity=1
+    stay = BookingAddRequest(
+        room_id=10, check_in_date=date(2034, 1, 10), check_out_date=date(2034, 1, 12)
+    )
+    booking = await db.bookings.create_booking(stay, user_id)
+    assert (booking.hotel_id, booking.price) == (5, 5500)
+
+    longer_stay = stay.model_copy(update={"check_in_date": date(2034, 1, 8)})
+    with pytest.raises(AllRoomsAreBookedException):
+        await db.bookings.create_booking(longer_stay, user_id)
+    await db.rollback()
+    nights = await db.room_inventory.get_filtered(room_id=10)
+    assert all(night.booked == 0 for night in nights if night.night < date(2034, 1, 10))
+
+    missing_room = stay.model_copy(update={"room_id": 100_000})
+    with pytest.raises(ObjectNotFoundException):
+        await db.bookings.create_booking(missing_room, user_id)
+    await db.rollback()
+
+
+async def test_concurrent_bookings_never_oversell(test_ids):
+    """Eight sessions race for the last unit of a room: exactly one wins."""
+    user_id, _, _ = test_ids
+    stay = BookingAddRequest(
+        room_id=10, check_in_date=date(2034, 2, 1), check_out_date=date(2034, 2, 4)
+    )
+
+    async def book():
+        async with DBManager(session_factory=new_session_null_pool) as db:
+            try:
+                booking = await db.bookings.create_booking(stay, user_id)
+            except AllRoomsAreBookedException:
+                await db.rollback()
+                return None
+            await db.commit()
+            return booking
+
+    bookings = [b for b in await asyncio.gather(*(book() for _ in range(8))) if b]
+    assert len(bookings) == 1
+
+    async with DBManager(session_factory=new_session_null_pool) as db:
+        (night,) = await db.room_inventory.get_filtered(room_id=10, night=date(2034, 2, 2))
+        assert (night.booked, night.capacity) == (1, 1)
+        await db.bookings.delete(id=bookings[0].id)
+        await db.commit()
+
+
+async def test_availability_cache_follows_bookings(db, test_ids):
+    user_id = test_ids[0]
+    stay = {"date_from": date(2034, 5, 10), "date_to": date(2034, 5, 12)}
+
+    async def book(room_id, check_in, check_out):
+        request = BookingAddRequest(
+            room_id=room_id, check_in_date=check_in, check_out_date=check_out
+        )
+        booking = await db.bookings.create_booking(request, user_id)
+        await db.commit()
+        return booking.id
+
+    async def rooms_of_hotel_5():
+        return {room.id for room in await db.rooms.get_filtered_by_time(hotel_id=5, **stay)}
+
+    async def rooms_left_of_hotel_5():
+        hotels = await db.hotels.get_filtered_by_time(title="", with_summary=True, limit=50, **stay)
+        return next(hotel.rooms_left for hotel in hotels if hotel.id == 5)
+
+    assert 10 in await rooms_of_hotel_5()
+    rooms_left = await rooms_left_of_hotel_5()
+    misses = repository_cache.misses
+
+    # Other hotels and other months leave the rooms of hotel 5 cached
+    booked = [
+        await book(1, date(2034, 5, 10), date(2034, 5, 11)),
+        await book(9, date(2034, 6, 10), date(2034, 6, 11)),
+    ]
+    assert 10 in await rooms_of_hotel_5()
+    assert repository_cache.misses == misses
+
+    # The last unit of room 10 for one night of the stay
+    booked.append(await book(10, date(2034, 5, 11), date(2034, 5, 12)))
+    assert 10 not in await rooms_of_hotel_5()
+    assert await rooms_left_of_hotel_5() == rooms_left - 1
+
+    for booking_id in booked:
+        await db.bookings.delete(id=booking_id)
+    await db.commit()
+    assert 10 in await rooms_of_hotel_5()
+
+
+async def test_concurrent_availability_searches_query_once():
+    stay = {"date_from": date(2035, 3, 1), "date_to": date(2035, 3, 4)}
+    flight = repository_cache.flight.stats()
+    misses = repository_cache.misses
+
+    async def search():
+        async with DBManager(session_factory=new_session_null_pool) as db:
+            return await db.hotels.get_filtered_by_time(title="", limit=20, **stay)
+
+    results = await asyncio.gather(*(search() for _ in range(8)))
+    assert all(result == results[0] for result in results)
+    assert results[0] is not results[1]
+    assert repository_cache.misses == misses + 8
+    assert repository_cache.flight.leaders == flight["leaders"] + 1
+    assert repository_cache.flight.followers == flight["followers"] + 7
@@ -0,0 +1,111 @@
+"""
+Concurrency stress test of POST /bookings.
+
+STRESS_CLIENTS clients race for the same room and dates through the ASGI app, with
+at most STRESS_CONNECTIONS requests in flight (TEST mode opens a connection per
+request, so this stays below max_connections). The test checks that no night is
+oversold and prints the throughput, p50/p99 latency and the DBManager.commit
+outcomes seen during the run. The clients and the app share one event loop, so
+requests/s is bounded by this process rather than by Postgres:
+
+    STRESS_CLIENTS=500 pytest -s tests/integration_tests/bookings/test_stress.py
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models import RoomInventoryDailyOrm
+from src.services.bookings import BookingService
+from src.utils.db_manager import commit_stats
+
+
+STRESS_CLIENTS = int(os.getenv("STRESS_CLIENTS", "200"))
+STRESS_CONNECTIONS = int(os.getenv("STRESS_CONNECTIONS", "50"))
+
+
+@dataclass
+class StressReport:
+    statuses: list[int]
+    latencies: list[float]
+    elapsed: float
+    commits: dict[str, int]
+
+    @property
+    def booked(self) -> int:
+        return self.statuses.count(200)
+
+    def percentile(self, p: int) -> float:
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+    def summary(self) -> str:
+        requests = len(self.statuses)
+        return (
+            f"{requests} clients, {self.booked} booked, "
+            f"{requests / self.elapsed:.1f} requests/s, "
+            f"p50 {self.percentile(50) * 1000:.1f} ms, p99 {self.percentile(99) * 1000:.1f} ms, "
+            f"retry rate {self.commits['retries'] / requests:.2%}, "
+            f"deadlock rate {self.commits['deadlocks'] / requests:.2%}, "
+            f"serialization failure rate {self.commits['serialization_failures'] / requests:.2%}"
+        )
+
+
+async def stress_bookings(ac, booking: dict, clients: int, connections: int) -> StressReport:
+    """Send the same booking from `clients` concurrent requests."""
+    in_flight = asyncio.Semaphore(connections)
+    commits_before = asdict(commit_stats)
+    latencies = []
+
+    async def client() -> int:
+        async with in_flight:
+            started = time.perf_counter()
+            response = await ac.post("/bookings", json=booking)
+            latencies.append(time.perf_counter() - started)
+            return response.status_code
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    commits = {name: value - commits_before[name] for name, value in asdict(commit_stats).items()}
+    return StressReport(list(statuses), latencies, elapsed, commits)
+
+
+@pytest.mark.parametrize("isolation_level", ["READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE"])
+async def test_concurrent_bookings_of_last_units(
+    authenticated_ac, db, capsys, monkeypatch, isolation_level
+):
+    monkeypatch.setattr(BookingService, "isolation_level", isolation_level)
+    room = await db.rooms.get_one(id=6)  # Heritage Suite, 2 units
+    check_in, check_out = date(2033, 3, 10), date(2033, 3, 14)
+    booking = {
+        "room_id": room.id,
+        "check_in_date": check_in.isoformat(),
+        "check_out_date": check_out.isoformat(),
+    }
+
+    report = await stress_bookings(
+        authenticated_ac, booking, STRESS_CLIENTS, min(STRESS_CONNECTIONS, STRESS_CLIENTS)
+    )
+    with capsys.disabled():
+        print(f"\nPOST /bookings stress at {isolation_level}: {report.summary()}")
+
+    assert set(report.statuses) <= {200, 409}
+    assert report.booked == room.quantity
+    bookings = await db.bookings.get_filtered(room_id=room.id, check_in_date=check_in)
+    assert len(bookings) == room.quantity
+    nights = select(func.min(RoomInventoryDailyOrm.booked), func.max(RoomInventoryDailyOrm.booked))
+    nights = nights.where(
+        RoomInventoryDailyOrm.room_id == room.id,
+        RoomInventoryDailyOrm.night >= check_in,
+        RoomInventoryDailyOrm.night < check_out,
+    )
+    assert tuple((await db.session.execute(nights)).one()) == (room.quantity, room.quantity)
+
+    await db.bookings.delete(room_id=room.id, check_in_date=check_in)
+    await db.commit()
@@ -13,3 +13,14 @@ async def test_get_facilities(ac):
     facilities = await ac.get("/facilities")
     assert facilities.status_code == 200
     assert len(facilities.json()) > 0
+
+
+async def test_facilities_bulk_reimport(ac):
+    facilities = [{"title": "Bulk Sauna"}, {"title": "Bulk Gym"}, {"title": "Bulk Sauna"}]
+    response = await ac.post("/facilities/bulk", json=facilities)
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK", "inserted": 2, "updated": 0, "unchanged": 0}
+
+    facilities.append({"title": "Bulk Pool"})
+    response = await ac.post("/facilities/bulk", json=facilities)
+    assert response.json() == {"status": "OK", "inserted": 1, "updated": 0, "unchanged": 2}
@@ -1,3 +1,5 @@
+from datetime import date
+
 from src.schemas.facilities import FacilityAdd
 
 
@@ -11,3 +13,23 @@ async def test_add_facilities(db):
 async def test_get_facilities(db):
     facilities = await db.facilities.get_all()
     assert len(facilities) > 0
+
+
+async def test_room_facility_ids_follow_writes(db):
+    async def rooms_with(facility_ids):
+        rooms = await db.rooms.get_filtered_by_time(
+            hotel_id=2,
+            date_from=date(2033, 5, 1),
+            date_to=date(2033, 5, 2),
+            facility_ids=facility_ids,
+        )
+        return sorted(room.id for room in rooms)
+
+    # Room 3 has Wi-Fi and Work Desk, room 4 also Air Conditioning and Room Service
+    assert await rooms_with([1, 8]) == [3, 4]
+    assert await rooms_with([8, 10]) == [4]
+    await db.room_facilities.set_room_facilities(3, [1, 8, 10])
+    assert await rooms_with([8, 10]) == [3, 4]
+    await db.room_facilities.delete(room_id=4, facility_id=10)
+    assert await rooms_with([8, 10]) == [3]
+    await db.rollback()
@@ -1,4 +1,137 @@
+from src.init import repository_cache
+from src.schemas.hotels import HotelAdd
+
+
 async def test_get_hotels(ac):
     hotels = await ac.get("/hotels", params={"date_from": "2026-01-01", "date_to": "2026-10-10"})
     assert hotels.status_code == 200
     assert len(hotels.json()) > 0
+
+
+async def test_get_hotels_fuzzy(ac):
+    params = {"date_from": "2032-01-01", "date_to": "2032-01-05", "location": "Odessa"}
+    hotels = await ac.get("/hotels", params=params)
+    assert hotels.status_code == 200
+    assert hotels.json() == []
+
+    hotels = await ac.get("/hotels", params={**params, "fuzzy": True})
+    assert hotels.status_code == 200
+    assert {hotel["location"].split(",")[0] for hotel in hotels.json()} == {"Odesa"}
+
+    hotels = await ac.get(
+        "/hotels",
+        params={
+            "date_from": "2032-01-01",
+            "date_to": "2032-01-05",
+            "title": "Bukovl",
+            "fuzzy": True,
+        },
+    )
+    assert hotels.status_code == 200
+    assert hotels.json() and "Bukovel" in hotels.json()[0]["title"]
+
+
+async def test_search_hotels(ac):
+    response = await ac.get("/hotels/search", params={"q": "odesa pool"})
+    assert response.status_code == 200
+    hotels = response.json()
+    assert [hotel["title"] for hotel in hotels] == ["Odesa Beach Resort"]
+    assert [room["title"] for room in hotels[0]["rooms"]] == ["Beach Villa"]
+
+    response = await ac.get("/hotels/search", params={"q": "views"})
+    assert response.status_code == 200
+    ranks = [hotel["rank"] for hotel in response.json()]
+    assert len(ranks) > 1 and ranks == sorted(ranks, reverse=True)
+
+
+async def test_get_hotels_cursor_pages(ac):
+    params = {"date_from": "2032-02-01", "date_to": "2032-02-03", "per_page": 3}
+    first = await ac.get("/hotels", params=params)
+    by_offset = await ac.get("/hotels", params={**params, "page": 2})
+    by_cursor = await ac.get("/hotels", params={**params, "cursor": first.headers["X-Next-Cursor"]})
+    assert by_cursor.status_code == 200
+    assert by_cursor.json() == by_offset.json()
+    titles = [hotel["title"] for hotel in first.json() + by_cursor.json()]
+    assert len(titles) == 6 and titles == sorted(titles)
+
+    response = await ac.get("/hotels", params={**params, "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_get_hotels_summary(ac):
+    params = {"date_from": "2033-04-01", "date_to": "2033-04-03", "title": "Bukovel"}
+    response = await ac.get("/hotels", params={**params, "summary": True})
+    assert response.status_code == 200
+    hotels = {hotel["title"]: hotel for hotel in response.json()}
+    assert hotels["Bukovel Mountain Lodge"]["rooms_left"] == 23
+    assert hotels["Bukovel Mountain Lodge"]["min_price"] == 2000
+
+    response = await ac.get("/hotels", params=params)
+    assert "rooms_left" not in response.json()[0]
+
+
+async def test_get_hotels_by_facilities(ac):
+    params = {"date_from": "2033-05-01", "date_to": "2033-05-03", "per_page": 20}
+    # Jacuzzi: rooms of Grand Kyiv Hotel, Odesa Beach Resort and Carpathian Chalet
+    hotels = (await ac.get("/hotels", params={**params, "facilities": [11]})).json()
+    assert len(hotels) == 3
+    # Jacuzzi and Fireplace: one room only
+    hotels = (await ac.get("/hotels", params={**params, "facilities": [11, 14]})).json()
+    assert [hotel["id"] for hotel in hotels] == [8]
+
+    rooms = (
+        await ac.get(
+            "/hotels/7/rooms",
+            params={"date_from": "2033-05-01", "date_to": "2033-05-03", "facilities": [13, 14]},
+        )
+    ).json()
+    assert [room["id"] for room in rooms] == [14]
+
+
+async def test_create_rooms_bulk_with_facilities(ac, db):
+    rooms = [
+        {"hotel_id": 7, "title": "Bulk Loft", "price": 900, "quantity": 2, "facilities": [14, 13]},
+        {"hotel_id": 7, "title": "Bulk Nook", "price": 500, "quantity": 1},
+    ]  # fmt: skip
+    response = await ac.post("/rooms/bulk", json=rooms)
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+    params = {"date_from": "2033-05-01", "date_to": "2033-05-03"}
+    found = (await ac.get("/hotels/7/rooms", params={**params, "facilities": [13, 14]})).json()
+    loft = next(room for room in found if room["title"] == "Bulk Loft")
+    assert sorted(f["id"] for f in loft["facilities"]) == [13, 14]
+    all_rooms = (await ac.get("/hotels/7/rooms", params=params)).json()
+    assert "Bulk Nook" in {room["title"] for room in all_rooms}
+    assert [h["id"] for h in (await ac.get("/hotels/search", params={"q": "loft"})).json()] == [7]
+
+    response = await ac.post("/rooms/bulk", json=[{**rooms[1], "hotel_id": 999999}])
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Hotel not found"
+    response = await ac.post("/rooms/bulk", json=[{**rooms[1], "facilities": [999999]}])
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Facility not found"
+
+    for room in await db.rooms.get_filtered(db.rooms.model.title.like("Bulk %")):
+        await db.room_facilities.delete(room_id=room.id)
+        await db.rooms.delete(id=room.id)
+    await db.commit()
+
+
+async def test_get_hotel_cached_until_edited(ac, db):
+    hotel_id = (await db.hotels.add(HotelAdd(title="Cached Inn", location="Reni"))).id
+    await db.commit()
+
+    assert (await ac.get(f"/hotels/{hotel_id}")).json()["title"] == "Cached Inn"
+    hits = repository_cache.hits
+    assert (await ac.get(f"/hotels/{hotel_id}")).json()["title"] == "Cached Inn"
+    assert repository_cache.hits == hits + 1
+
+    await ac.patch(f"/hotels/{hotel_id}", json={"title": "Renamed Inn"})
+    assert (await ac.get(f"/hotels/{hotel_id}")).json()["title"] == "Renamed Inn"
+
+
+async def test_missing_hotel_is_not_cached(ac):
+    for _ in range(2):
+        response = await ac.get("/hotels/987654/images")
+        assert response.status_code == 404
@@ -1,7 +1,154 @@
-from src.schemas.hotels import HotelAdd
+from datetime import date
+
+from src.init import repository_cache
+from src.schemas.bookings import BookingAdd
+from src.schemas.facilities import FacilityAdd, FacilityRoomAdd
+from src.schemas.hotels import HotelAdd, HotelPatch
+from src.schemas.rooms import Room, RoomAdd, RoomPatch
 
 
 async def test_add_hotel(db):
     hotel_data = HotelAdd(title="Test Hotel", location="Test Hotel Location")
     await db.hotels.add(hotel_data)
     await db.commit()
+
+
+async def test_search_vector_follows_writes(db):
+    hotel = await db.hotels.add(HotelAdd(title="Quiet Harbour", location="Izmail"))
+    room = await db.rooms.add(
+        RoomAdd(hotel_id=hotel.id, title="Sauna Suite", price=100, quantity=1)
+    )
+
+    async def found(text):
+        return [result.id for result in await db.hotels.search(text, limit=10, offset=0)]
+
+    assert await found("sauna") == [hotel.id]
+    await db.rooms.edit(RoomPatch(description="Private jacuzzi"), exclude_unset=True, id=room.id)
+    assert await found("jacuzzi") == [hotel.id]
+    await db.hotels.edit(HotelPatch(location="Vylkove"), exclude_unset=True, id=hotel.id)
+    assert await found("izmail") == []
+    assert await found("vylkove sauna") == [hotel.id]
+    await db.rooms.delete(id=room.id)
+    assert await found("sauna") == []
+    await db.rollback()
+
+
+async def test_availability_summary(db):
+    async def summary():
+        (hotel,) = await db.hotels.get_filtered_by_time(
+            date_from=date(2033, 3, 1),
+            date_to=date(2033, 3, 4),
+            title="Odesa Opera",
+            with_summary=True,
+        )
+        return hotel.rooms_left, hotel.min_price
+
+    # Room 9: 12 units for 1900, room 10: 1 unit for 5500
+    assert await summary() == (13, 1900)
+
+    user_id = (await db.users.get_all())[0].id
+    one_night = dict(
+        user_id=user_id,
+        hotel_id=5,
+        check_in_date=date(2033, 3, 2),
+        check_out_date=date(2033, 3, 3),
+        price=1900,
+    )
+    await db.bookings.add_bulk([BookingAdd(room_id=9, **one_night)] * 12)
+    # The busiest night decides: room 9 is sold out for the stay
+    assert await summary() == (1, 5500)
+    await db.rollback()
+
+
+async def test_copy_bulk_rooms(db):
+    """More rows than an INSERT could bind (32767 parameters), streamed with COPY."""
+    hotel = await db.hotels.add(HotelAdd(title="Copy Hotel", location="Copy City"))
+    rooms = [
+        RoomAdd(hotel_id=hotel.id, title=f"Copied Room {i}", price=100 + i, quantity=1)
+        for i in range(10_000)
+    ]
+    assert await db.rooms.copy_bulk(rooms) == len(rooms)
+    assert len(await db.rooms.get_filtered(hotel_id=hotel.id)) == len(rooms)
+    assert [result.id for result in await db.hotels.search("copied", limit=10, offset=0)] == [
+        hotel.id
+    ]
+    await db.rollback()
+
+
+async def test_upsert_bulk_rooms(db):
+    hotel = await db.hotels.add(HotelAdd(title="Upsert Hotel", location="Upsert City"))
+    room = await db.rooms.add(RoomAdd(hotel_id=hotel.id, title="Plain", price=100, quantity=1))
+    await db.bookings.add(
+        BookingAdd(
+            room_id=room.id,
+            hotel_id=hotel.id,
+            user_id=1,
+            price=100,
+            check_in_date=date(2036, 1, 1),
+            check_out_date=date(2036, 1, 2),
+        )
+    )
+    rooms = [
+        Room(**room.model_dump(exclude={"title", "quantity"}), title="Turret", quantity=3),
+        Room(id=room.id + 1_000_000, hotel_id=hotel.id, title="Attic", price=50, quantity=1),
+    ]
+    update_cols = ["title", "quantity"]
+    result = await db.rooms.upsert_bulk(rooms, conflict_cols=["id"], update_cols=update_cols)
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 0)
+    result = await db.rooms.upsert_bulk(rooms, conflict_cols=["id"], update_cols=update_cols)
+    assert (result.inserted, result.updated, result.unchanged) == (0, 0, 2)
+
+    assert [h.id for h in await db.hotels.search("turret attic", limit=10, offset=0)] == [hotel.id]
+    night = await db.room_inventory.get_one(room_id=room.id, night=date(2036, 1, 1))
+    assert (night.booked, night.capacity) == (1, 3)
+    await db.rollback()
+
+
+async def test_upsert_bulk_moves_room_between_hotels(db):
+    old = await db.hotels.add(HotelAdd(title="Upsert Old", location="Upsert City"))
+    new = await db.hotels.add(HotelAdd(title="Upsert New", location="Upsert City"))
+    room = await db.rooms.add(RoomAdd(hotel_id=old.id, title="Zanzibarqux", price=1, quantity=1))
+    moved = Room(**room.model_dump(exclude={"hotel_id"}), hotel_id=new.id)
+    await db.rooms.upsert_bulk([moved], conflict_cols=["id"], update_cols=["hotel_id"])
+    assert [h.id for h in await db.hotels.search("zanzibarqux", limit=10, offset=0)] == [new.id]
+    await db.rollback()
+
+
+async def test_cached_reads_see_own_writes(db):
+    hotel = await db.hotels.add(HotelAdd(title="Own Writes", location="Kiliia"))
+    await db.commit()
+    assert (await db.hotels.get_one(id=hotel.id)).title == "Own Writes"
+
+    await db.hotels.edit(HotelPatch(title="Uncommitted"), exclude_unset=True, id=hotel.id)
+    assert (await db.hotels.get_one(id=hotel.id)).title == "Uncommitted"
+    await db.rollback()
+    assert (await db.hotels.get_one(id=hotel.id)).title == "Own Writes"
+
+
+async def test_cached_room_follows_facilities(db):
+    room = await db.rooms.get_one_or_none(id=1)
+    facility = await db.facilities.add(FacilityAdd(title="Cache test sauna"))
+    await db.room_facilities.add_bulk([FacilityRoomAdd(room_id=1, facility_id=facility.id)])
+    await db.commit()
+    room_after = await db.rooms.get_one_or_none(id=1)
+    assert {f.id for f in room_after.facilities} == {f.id for f in room.facilities} | {facility.id}
+
+    await db.facilities.edit(FacilityAdd(title="Cache test spa"), id=facility.id)
+    await db.commit()
+    titles = {f.title for f in (await db.rooms.get_one_or_none(id=1)).facilities}
+    assert "Cache test spa" in titles
+
+    await db.room_facilities.delete(room_id=1, facility_id=facility.id)
+    await db.facilities.delete(id=facility.id)
+    await db.commit()
+
+
+async def test_search_fills_hotel_entries(db):
+    hotels = await db.hotels.get_filtered_by_time(
+        date_from=date(2036, 9, 1), date_to=date(2036, 9, 3), title="", limit=5
+    )
+    assert hotels
+    hits, misses = repository_cache.hits, repository_cache.misses
+    for hotel in hotels:
+        assert await db.hotels.get_one(id=hotel.id) == hotel
+    assert (repository_cache.hits, repository_cache.misses) == (hits + len(hotels), misses)
@@ -0,0 +1,66 @@
+import pytest
+from dataclasses import asdict
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.utils.db_manager import TRANSACTION_ATTEMPTS, commit_stats
+
+
+def raise_sqlstate(code: str):
+    return text(f"DO $$ BEGIN RAISE EXCEPTION 'test' USING ERRCODE = '{code}'; END $$")
+
+
+@pytest.mark.parametrize(
+    "code, counter", [("40001", "serialization_failures"), ("40P01", "deadlocks")]
+)
+async def test_transaction_replayed_after_retryable_error(db, code, counter):
+    before = asdict(commit_stats)
+    calls = []
+
+    async def operation():
+        calls.append(await db.session.scalar(text("SELECT txid_current()")))
+        if len(calls) == 1:
+            await db.session.execute(raise_sqlstate(code))
+        return "done"
+
+    assert await db.run_in_transaction(operation, isolation_level="SERIALIZABLE") == "done"
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert commit_stats.retries == before["retries"] + 1
+    assert getattr(commit_stats, counter) == before[counter] + 1
+    assert commit_stats.commits == before["commits"] + 1
+
+
+async def test_transaction_gives_up_after_last_attempt(db):
+    calls = 0
+
+    async def operation():
+        nonlocal calls
+        calls += 1
+        await db.session.execute(raise_sqlstate("40001"))
+
+    with pytest.raises(DBAPIError):
+        await db.run_in_transaction(operation)
+    assert calls == TRANSACTION_ATTEMPTS
+
+
+async def test_transaction_not_replayed_after_other_errors(db):
+    calls = 0
+
+    async def operation():
+        nonlocal calls
+        calls += 1
+        await db.session.execute(raise_sqlstate("23505"))
+
+    with pytest.raises(DBAPIError):
+        await db.run_in_transaction(operation)
+    assert calls == 1
+
+
+async def test_transaction_isolation_level(db):
+    async def isolation():
+        return await db.session.scalar(text("SHOW transaction_isolation"))
+
+    assert await db.run_in_transaction(isolation, isolation_level="REPEATABLE READ") == (
+        "repeatable read"
+    )
+    assert await db.run_in_transaction(isolation) == "read committed"
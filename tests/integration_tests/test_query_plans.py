@@ -0,0 +1,203 @@
+"""
+Query plans of the hot repository queries.
+
+Each test seeds a few thousand rows inside the test transaction, runs the repository
+method, EXPLAINs the statements it sent and checks that the expected index is used.
+Everything is rolled back afterwards, including the ANALYZE statistics.
+"""
+
+import pytest
+from contextlib import contextmanager
+from datetime import date
+from sqlalchemy import event, select, text
+
+from src.database import engine_null_pool
+from src.models import HotelsOrm, RoomsOrm
+from src.utils.pagination import encode_cursor
+
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, email, hashed_password)
+    SELECT 'plan_user' || i, 'plan_user' || i || '@example.com', 'x'
+    FROM generate_series(1, 500) AS i
+    """,
+    """
+    INSERT INTO hotels (title, location)
+    SELECT 'Plan Hotel ' || i, 'Plan City ' || (i % 20) FROM generate_series(1, 200) AS i
+    """,
+    """
+    INSERT INTO rooms (hotel_id, title, price, quantity)
+    SELECT h.id, 'Plan Room ' || r, 1000 + r, 1 + r % 4
+    FROM hotels h CROSS JOIN generate_series(1, 10) AS r
+    WHERE h.title LIKE 'Plan Hotel %'
+    """,
+    """
+    INSERT INTO room_facilities (room_id, facility_id)
+    SELECT r.id, f.id FROM rooms r CROSS JOIN facilities f
+    WHERE r.title LIKE 'Plan Room %' AND (r.id + f.id) % 4 = 0
+    """,
+    """
+    INSERT INTO bookings (user_id, hotel_id, room_id, check_in_date, check_out_date, price)
+    SELECT u.id, r.hotel_id, r.id, d, d + 1 + (i % 5), r.price
+    FROM generate_series(1, 8000) AS i
+    JOIN rooms r ON r.title LIKE 'Plan Room %'
+        AND r.id = (SELECT min(id) FROM rooms WHERE title LIKE 'Plan Room %') + i % 2000
+    JOIN users u ON u.username = 'plan_user' || (1 + i % 500)
+    CROSS JOIN LATERAL (SELECT DATE '2035-01-01' + i % 365 AS d) AS dates
+    """,
+]
+
+
+@pytest.fixture
+async def seeded_db(db):
+    """Repository session with a seeded, analyzed dataset that is rolled back afterwards."""
+    for sql in SEED_SQL:
+        await db.session.execute(text(sql))
+    await db.room_inventory.rebuild()
+    await db.hotels.refresh_search_vector(select(HotelsOrm.id))
+    await db.room_facilities.sync_facility_ids(select(RoomsOrm.id))
+    await db.session.execute(text("ANALYZE"))
+    yield db
+    await db.rollback()
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine_null_pool.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine_null_pool.sync_engine, "before_cursor_execute", capture)
+
+
+async def used_indexes(db, statements) -> set[str]:
+    """Names of the indexes in the plans of the captured statements."""
+    connection = await db.session.connection()
+    indexes = set()
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        nodes = [result.scalar_one()[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if "Index Name" in node:
+                indexes.add(node["Index Name"])
+            nodes.extend(node.get("Plans", []))
+    return indexes
+
+
+async def test_rooms_of_hotel_plan(seeded_db):
+    hotel = (
+        await seeded_db.hotels.get_all(title="Plan Hotel 7", location=None, limit=1, offset=0)
+    )[0]
+    with captured_statements() as statements:
+        await seeded_db.rooms.get_filtered_by_time(
+            hotel_id=hotel.id, date_from=date(2035, 3, 1), date_to=date(2035, 3, 4)
+        )
+    indexes = await used_indexes(seeded_db, statements)
+    assert "ix_rooms_hotel_id" in indexes
+    assert indexes & {"room_inventory_daily_pkey", "ix_room_inventory_daily_sold_out"}
+
+
+async def test_my_bookings_plan(seeded_db):
+    user = await seeded_db.users.get_one(username="plan_user42")
+    with captured_statements() as statements:
+        await seeded_db.bookings.get_filtered(user_id=user.id)
+    assert "ix_bookings_user_id_check_in_date_id" in await used_indexes(seeded_db, statements)
+
+
+async def test_room_bookings_overlap_plan(seeded_db):
+    room = (await seeded_db.rooms.get_filtered(title="Plan Room 3"))[0]
+    with captured_statements() as statements:
+        await seeded_db.bookings.get_overlapping(
+            date(2035, 6, 1), date(2035, 6, 8), room_id=room.id
+        )
+    indexes = await used_indexes(seeded_db, statements)
+    assert indexes & {"ix_bookings_room_id_stay", "ix_bookings_room_id_dates"}
+
+
+async def test_today_checkin_plan(seeded_db):
+    with captured_statements() as statements:
+        await seeded_db.bookings.get_bookings_with_today_checkin()
+    assert "ix_bookings_check_in_date_id" in await used_indexes(seeded_db, statements)
+
+
+async def test_room_vacancy_plan(seeded_db):
+    room = (await seeded_db.rooms.get_filtered(title="Plan Room 5"))[0]
+    with captured_statements() as statements:
+        await seeded_db.room_inventory.has_vacancy(room.id, date(2035, 2, 1), date(2035, 2, 9))
+    indexes = await used_indexes(seeded_db, statements)
+    assert indexes & {"room_inventory_daily_pkey", "ix_room_inventory_daily_sold_out"}
+
+
+async def test_room_facilities_plan(seeded_db):
+    room = (await seeded_db.rooms.get_filtered(title="Plan Room 1"))[0]
+    with captured_statements() as statements:
+        await seeded_db.room_facilities.set_room_facilities(room.id, [1, 2])
+    indexes = await used_indexes(seeded_db, statements)
+    assert "uq_room_facilities_room_id_facility_id" in indexes
+
+
+async def test_fuzzy_hotel_search_plan(seeded_db):
+    # A few hundred hotels fit in a handful of pages, so only check that the
+    # similarity filter is indexable rather than that the planner prefers it
+    await seeded_db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    with captured_statements() as statements:
+        await seeded_db.hotels.get_all(
+            title="Plan Hotl 77", location="Plan Cty", limit=10, offset=0, fuzzy=True
+        )
+    indexes = await used_indexes(seeded_db, statements)
+    assert indexes & {"ix_hotels_title_trgm", "ix_hotels_location_trgm"}
+
+
+async def test_full_text_hotel_search_plan(seeded_db):
+    await seeded_db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    with captured_statements() as statements:
+        await seeded_db.hotels.search("plan room", limit=10, offset=0)
+    assert "ix_hotels_search_vector" in await used_indexes(seeded_db, statements)
+
+
+async def test_bookings_keyset_page_plan(seeded_db):
+    user = await seeded_db.users.get_one(username="plan_user42")
+    cursor = encode_cursor(date(2035, 6, 1), 0)
+    with captured_statements() as statements:
+        await seeded_db.bookings.get_page(limit=20, cursor=cursor)
+        await seeded_db.bookings.get_page(limit=20, cursor=cursor, user_id=user.id)
+    indexes = await used_indexes(seeded_db, statements)
+    assert {"ix_bookings_check_in_date_id", "ix_bookings_user_id_check_in_date_id"} <= indexes
+
+
+async def test_hotels_keyset_page_plan(seeded_db):
+    with captured_statements() as statements:
+        await seeded_db.hotels.get_all(
+            title=None,
+            location=None,
+            limit=10,
+            offset=0,
+            cursor=encode_cursor("Plan Hotel 150", 0),
+        )
+    assert "ix_hotels_title_id" in await used_indexes(seeded_db, statements)
+
+
+async def test_hotels_availability_summary_plan(seeded_db):
+    with captured_statements() as statements:
+        await seeded_db.hotels.get_filtered_by_time(
+            date_from=date(2035, 3, 1), date_to=date(2035, 3, 8), with_summary=True
+        )
+    indexes = await used_indexes(seeded_db, statements)
+    assert "ix_rooms_hotel_id" in indexes
+    assert "room_inventory_daily_pkey" in indexes
+
+
+async def test_rooms_by_facilities_plan(seeded_db):
+    # Two thousand rooms are cheaper to scan, check that the containment is indexable
+    await seeded_db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    with captured_statements() as statements:
+        await seeded_db.rooms.get_filtered(RoomsOrm.facility_ids.contains([1, 5]))
+    assert "ix_rooms_facility_ids" in await used_indexes(seeded_db, statements)
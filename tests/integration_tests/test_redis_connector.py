@@ -0,0 +1,37 @@
+import msgpack
+import pytest
+
+from src.init import redis_manager
+
+
+async def test_mget_and_mset():
+    await redis_manager.mset({"test-redis:a": "1", "test-redis:b": "2"}, expire=60)
+    assert await redis_manager.mget(["test-redis:a", "test-redis:missing", "test-redis:b"]) == [
+        "1",
+        None,
+        "2",
+    ]
+    assert 0 < await redis_manager.redis.ttl("test-redis:a") <= 60
+    assert await redis_manager.mget([]) == []
+
+
+async def test_binary_values():
+    payload = msgpack.packb({"id": 1, "title": "Hotel \xe9", "photo": b"\xff\xd8"})
+    await redis_manager.mset({"test-redis:packed": payload})
+    [packed] = await redis_manager.mget_bytes(["test-redis:packed"])
+    assert msgpack.unpackb(packed) == {"id": 1, "title": "Hotel \xe9", "photo": b"\xff\xd8"}
+
+
+async def test_pipeline_and_transaction():
+    async with redis_manager.pipeline() as pipe:
+        pipe.set("test-redis:counter", 1)
+        pipe.incr("test-redis:counter")
+        assert await pipe.execute() == [True, 2]
+        pipe.incr("test-redis:counter")  # sent when the block exits
+    assert await redis_manager.get("test-redis:counter") == "3"
+
+    with pytest.raises(ZeroDivisionError):
+        async with redis_manager.transaction() as tx:
+            tx.incr("test-redis:counter")
+            1 / 0
+    assert await redis_manager.get("test-redis:counter") == "3"
@@ -0,0 +1,113 @@
+import asyncio
+import importlib.util
+import time
+
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from src.init import redis_manager
+from src.utils.stampede import SingleFlight
+from src.utils.two_tier_cache import TwoTierCache, cache_route, request_key_builder
+
+
+async def wait_for(condition, timeout: float = 1.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+async def test_set_evicts_other_workers():
+    first = TwoTierCache(redis_manager, maxsize=100, ttl=60)
+    second = TwoTierCache(redis_manager, maxsize=100, ttl=60)
+    await first.start()
+    await second.start()
+    try:
+        await first.set("test-cache:catalog", b"v1", expire=60)
+        await wait_for(lambda: second.invalidations == 1)
+        assert await second.get("test-cache:catalog") == b"v1"  # from Redis
+        assert await second.get("test-cache:catalog") == b"v1"  # from L1
+        assert (second.l2_hits, second.l1_hits) == (1, 1)
+
+        await first.set("test-cache:catalog", b"v2", expire=60)
+        await wait_for(lambda: second.invalidations == 2)
+        assert await second.get("test-cache:catalog") == b"v2"
+
+        await first.clear(namespace="test-cache")
+        await wait_for(lambda: second.invalidations == 3)
+        assert await second.get("test-cache:catalog") is None
+        assert first.invalidations == 0  # own messages are ignored
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_concurrent_misses_wait_for_one_computation():
+    workers = [
+        TwoTierCache(
+            redis_manager, maxsize=100, ttl=60, flight=SingleFlight(redis_manager, lock=True)
+        )
+        for _ in range(2)
+    ]
+    for worker in workers:
+        await worker.start()
+    try:
+        # The first request to miss computes the value, in any worker
+        assert await workers[0].get_with_ttl("test-cache:search") == (0, None)
+        waiting = [
+            asyncio.create_task(worker.get("test-cache:search"))
+            for worker in workers
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.1)
+        assert not any(task.done() for task in waiting)
+
+        await workers[0].set("test-cache:search", b"hotels", expire=60)
+        assert await asyncio.gather(*waiting) == [b"hotels"] * 6
+        assert workers[0].flight.stats()["followers"] == 3
+        assert workers[1].flight.stats()["remote_waits"] == 1
+    finally:
+        for worker in workers:
+            await worker.close()
+
+
+@pytest.fixture
+def real_cache_decorator(monkeypatch):
+    # conftest replaces fastapi-cache's decorator with a no-op for the whole suite
+    spec = importlib.util.find_spec("fastapi_cache.decorator")
+    decorator = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(decorator)
+    monkeypatch.setattr("src.utils.two_tier_cache.cache", decorator.cache)
+
+
+async def test_failed_route_releases_waiting_requests(real_cache_decorator):
+    worker = TwoTierCache(redis_manager, maxsize=100, ttl=60, flight=SingleFlight(timeout=5))
+    await worker.start()
+    FastAPICache.reset()
+    FastAPICache.init(worker, prefix="test-route", key_builder=request_key_builder)
+    calls = 0
+
+    @cache_route(expire=60, namespace="flaky")
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        if calls == 1:
+            raise ConnectionError
+        return {"calls": calls}
+
+    try:
+        started = time.monotonic()
+        results = await asyncio.gather(*(flaky() for _ in range(4)), return_exceptions=True)
+        # Whichever request reached the handler first failed, one of the waiting
+        # requests computed it at once, for all of them
+        failed = [r for r in results if isinstance(r, ConnectionError)]
+        assert len(failed) == 1
+        assert [r for r in results if r not in failed] == [{"calls": 2}] * 3
+        assert time.monotonic() - started < 1
+    finally:
+        await worker.close()
+        FastAPICache.reset()
+        FastAPICache.init(InMemoryBackend(), prefix="test-cache")
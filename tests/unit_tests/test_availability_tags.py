@@ -0,0 +1,17 @@
+from datetime import date
+
+from src.repositories.utils import availability_tags
+
+
+def test_one_tag_per_month_of_the_nights():
+    assert availability_tags(date(2030, 1, 30), date(2030, 3, 1)) == [
+        "availability:2030-01",
+        "availability:2030-02",
+    ]
+
+
+def test_hotel_tags():
+    assert availability_tags(date(2030, 12, 31), date(2031, 1, 2), hotel_id=7) == [
+        "availability:7:2030-12",
+        "availability:7:2031-01",
+    ]
@@ -0,0 +1,17 @@
+from src.utils.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    items = [f"token-{i}" for i in range(1000)]
+    bloom = BloomFilter.from_items(items, capacity=1000)
+    assert all(item in bloom for item in items)
+
+
+def test_false_positive_rate():
+    bloom = BloomFilter.from_items((f"token-{i}" for i in range(1000)), capacity=1000)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 50  # 0.1% expected, 0.5% allowed
+
+
+def test_empty_filter():
+    assert "token" not in BloomFilter(capacity=0)
@@ -0,0 +1,16 @@
+from src.utils.password_hasher import PasswordHasher
+
+
+async def test_hash_many_keeps_order():
+    hasher = PasswordHasher(workers=2)
+    passwords = [f"password{i}" for i in range(3)]
+    inline = await hasher.hash_many(passwords)
+    await hasher.start()
+    try:
+        pooled = await hasher.hash_many(passwords)
+        assert await hasher.verify("password2", pooled[2])
+        assert not await hasher.verify("password2", pooled[1])
+    finally:
+        await hasher.close()
+    for password, hashed in zip(passwords, inline):
+        assert await hasher.verify(password, hashed)
@@ -0,0 +1,60 @@
+import asyncio
+import random
+
+from src.utils.stampede import MISSING, SingleFlight, should_refresh_early
+
+
+async def load_once(flight: SingleFlight, key: str, load):
+    value = await flight.join(key)
+    if value is not MISSING:
+        return value
+    try:
+        value = await load()
+        return value
+    finally:
+        await flight.done(key, value)
+
+
+def test_early_refresh_grows_closer_to_expiry():
+    random.seed(0)
+    far = sum(should_refresh_early(0.1, 60) for _ in range(1000))
+    near = sum(should_refresh_early(0.1, 0.1) for _ in range(1000))
+    assert far == 0
+    assert 300 < near < 450  # P = e^-1
+    assert should_refresh_early(0.1, 0)
+
+
+async def test_concurrent_loads_are_coalesced():
+    flight = SingleFlight()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return {"hotels": loads}
+
+    results = await asyncio.gather(*(load_once(flight, "search", load) for _ in range(20)))
+    assert loads == 1
+    assert all(result == {"hotels": 1} for result in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 19, "remote_waits": 0}
+
+
+async def test_followers_load_when_the_leader_fails():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise ConnectionError
+        return calls
+
+    results = await asyncio.gather(
+        *(load_once(flight, "search", load) for _ in range(5)), return_exceptions=True
+    )
+    assert isinstance(results[0], ConnectionError)
+    # One of the followers took over and the rest waited for it
+    assert results[1:] == [2, 2, 2, 2]
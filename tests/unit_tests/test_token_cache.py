@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from src.exeptions import TokenExpiredException
+from src.services.auth import AuthService
+from src.utils.token_cache import VerifiedTokenCache
+
+
+def test_lru_eviction_and_stats():
+    cache = VerifiedTokenCache(maxsize=2, ttl=60)
+    cache.put("a", {"user_id": 1})
+    cache.put("b", {"user_id": 2})
+    assert cache.get("a") == {"user_id": 1}
+    cache.put("c", {"user_id": 3})  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == {"user_id": 3}
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_entries_expire_at_exp():
+    cache = VerifiedTokenCache(maxsize=10, ttl=60)
+    cache.put("expired", {"exp": time.time() - 1})
+    cache.put("fresh", {"exp": time.time() + 60})
+    assert cache.get("expired") is None
+    assert cache.get("fresh") is not None
+
+
+def test_cached_token_is_not_verified_again(monkeypatch):
+    auth = AuthService()
+    token = auth.create_access_token({"user_id": 1})
+    assert auth.decode_access_token(token)["user_id"] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("signature checked again")
+
+    monkeypatch.setattr("src.services.auth.jwt.decode", fail)
+    assert auth.decode_access_token(token)["user_id"] == 1
+    assert auth.token_cache.stats()["hits"] == 1
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    auth = AuthService()
+    monkeypatch.setattr("src.services.auth.settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES", -1)
+    token = auth.create_access_token({"user_id": 1})
+    with pytest.raises(TokenExpiredException):
+        auth.decode_access_token(token)
+    with pytest.raises(TokenExpiredException):
+        auth.decode_access_token(token)
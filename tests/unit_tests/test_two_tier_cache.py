@@ -0,0 +1,30 @@
+import time
+
+from src.utils.two_tier_cache import TwoTierCache
+
+
+def test_local_tier_evicts_least_recently_used():
+    cache = TwoTierCache(redis_manager=None, maxsize=2, ttl=60)
+    cache._put_local("a", b"1", None)
+    cache._put_local("b", b"2", None)
+    cache._get_local("a")
+    cache._put_local("c", b"3", None)
+    assert cache._get_local("b") is None
+    assert cache._get_local("a")[-1] == b"1"
+
+
+def test_local_tier_never_outlives_redis_expiry(monkeypatch):
+    cache = TwoTierCache(redis_manager=None, maxsize=2, ttl=60)
+    cache._put_local("a", b"1", 2)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 3)
+    assert cache._get_local("a") is None
+
+
+def test_namespace_eviction():
+    cache = TwoTierCache(redis_manager=None, maxsize=10, ttl=60)
+    cache._put_local("app:facilities:x", b"1", None)
+    cache._put_local("app:hotels:y", b"2", None)
+    cache._evict(namespace="app:facilities")
+    assert cache._get_local("app:facilities:x") is None
+    assert cache._get_local("app:hotels:y") is not None